@@ -0,0 +1,206 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Requests per second and burst size per endpoint; endpoints not listed are not limited
+DEFAULT_RATE_LIMITS = {
+    "/api/start-interview": (0.2, 5),
+    "/api/submit-answer": (1.0, 10),
+    "/api/skip-question": (1.0, 10),
+    "/api/cancel-interview": (1.0, 10),
+    "/api/get-summary": (1.0, 10),
+    "/api/analytics": (1.0, 5),
+}
+
+# Endpoints whose requests run an answer evaluation
+EVALUATION_ENDPOINTS = frozenset({"/api/submit-answer"})
+
+# Why a request was turned away: HTTP status, Retry-After seconds and the shed counter label
+Rejection = namedtuple("Rejection", ["status", "retry_after", "reason"])
+
+
+def parse_rate_limits(spec):
+    """Rate limits from ``path=rate/burst,...`` on top of the defaults.
+
+    Empty or "off" disables them and "on" enables just the defaults.
+    """
+    spec = spec.strip()
+    if spec.lower() in ("", "off"):
+        return {}
+    limits = dict(DEFAULT_RATE_LIMITS)
+    if spec.lower() == "on":
+        return limits
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        path, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        rate, burst = float(rate), float(burst or 1)
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"RATE_LIMITS needs rate > 0 and burst >= 1: {item}")
+        limits[path.strip()] = (rate, burst)
+    return limits
+
+
+class TokenBucketLimiter:
+    """Token buckets per (client, endpoint), kept in least-recently-used order.
+
+    Each bucket holds up to ``burst`` tokens and refills at ``rate`` per
+    second; a request takes one token. A bucket left alone for ``idle_ttl``
+    seconds has refilled completely, so dropping it changes nothing: every
+    call evicts such buckets from the old end of the LRU (amortized O(1)),
+    and the least recently used bucket is dropped early if there are more
+    than ``max_buckets``.
+    """
+
+    def __init__(self, limits, max_buckets=100000, clock=time.monotonic):
+        if max_buckets < 1:
+            raise ValueError(f"RATE_LIMIT_MAX_BUCKETS must be at least 1: {max_buckets}")
+        self.limits = limits
+        self.max_buckets = max_buckets
+        self.idle_ttl = max((burst / rate for rate, burst in limits.values()), default=0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (client, endpoint) -> [tokens, last refill time]
+        self._buckets = OrderedDict()
+        self.evicted = 0
+
+    def acquire(self, client, endpoint):
+        """Take a token; returns 0 if allowed, else seconds until one is available"""
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return 0
+        rate, burst = limit
+        key = (client, endpoint)
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            self._evict(now)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def _evict(self, now):
+        buckets = self._buckets
+        while len(buckets) > self.max_buckets:
+            buckets.popitem(last=False)
+            self.evicted += 1
+        for _ in range(2):
+            if not buckets:
+                break
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket[1] < self.idle_ttl:
+                break
+            del buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class ConcurrencyGate:
+    """Non-blocking counting semaphore: enter fails instead of waiting when full"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class AdmissionControl:
+    """Rate limits per client and endpoint plus a cap on in-flight evaluations.
+
+    ``admit`` runs before a request is handled and either returns None or
+    a Rejection to answer immediately with its status and Retry-After:
+    429 when the client's bucket for the endpoint is empty, 503 when
+    ``max_evaluations`` answers are already being evaluated. An admitted
+    request to an evaluation endpoint must be followed by ``release``.
+    Shed requests are counted by endpoint and reason.
+    """
+
+    def __init__(self, limits=None, max_buckets=100000, max_evaluations=64, overload_retry_after=1,
+                 trusted_proxies=0, clock=time.monotonic):
+        self.limiter = TokenBucketLimiter(DEFAULT_RATE_LIMITS if limits is None else limits, max_buckets, clock)
+        self.evaluations = ConcurrencyGate(max_evaluations) if max_evaluations else None
+        self.overload_retry_after = overload_retry_after
+        self.trusted_proxies = trusted_proxies
+        self._lock = threading.Lock()
+        # (endpoint, reason) -> requests rejected
+        self.shed = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build admission control configured from RATE_LIMIT* and EVALUATION_* environment variables"""
+        return cls(
+            limits=parse_rate_limits(os.environ.get("RATE_LIMITS", "")),
+            max_buckets=int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", 100000)),
+            max_evaluations=int(os.environ.get("EVALUATION_CONCURRENCY", 64)),
+            overload_retry_after=int(os.environ.get("EVALUATION_RETRY_AFTER", 1)),
+            trusted_proxies=int(os.environ.get("RATE_LIMIT_TRUSTED_PROXIES", 0)),
+        )
+
+    def client_id(self, headers, remote_addr):
+        """The client a request counts against.
+
+        With ``trusted_proxies`` set to N, that is the address N entries from
+        the right of X-Forwarded-For: the one our outermost proxy saw. Entries
+        further left are whatever the client sent and are never used. Without
+        trusted proxies, or if the header is shorter than that, it is the peer.
+        """
+        if self.trusted_proxies:
+            forwarded = [
+                address.strip()
+                for header in headers.getlist("X-Forwarded-For")
+                for address in header.split(",")
+            ]
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        return remote_addr or "unknown"
+
+    def admit(self, client, endpoint):
+        wait = self.limiter.acquire(client, endpoint)
+        if wait:
+            return self._reject(endpoint, Rejection(429, math.ceil(wait), "rate_limited"))
+        if self.evaluations is not None and endpoint in EVALUATION_ENDPOINTS and not self.evaluations.enter():
+            return self._reject(endpoint, Rejection(503, self.overload_retry_after, "overloaded"))
+        return None
+
+    def release(self, endpoint):
+        if self.evaluations is not None and endpoint in EVALUATION_ENDPOINTS:
+            self.evaluations.leave()
+
+    def _reject(self, endpoint, rejection):
+        key = (endpoint, rejection.reason)
+        with self._lock:
+            self.shed[key] = self.shed.get(key, 0) + 1
+        return rejection
+
+    def shed_counts(self):
+        with self._lock:
+            return list(self.shed.items())
+
+    def in_flight_evaluations(self):
+        return self.evaluations.in_flight if self.evaluations is not None else 0
+
+
+def rejection_message(rejection):
+    if rejection.reason == "overloaded":
+        return "Server is busy, please retry shortly"
+    return "Too many requests, please slow down"
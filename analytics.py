@@ -0,0 +1,384 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+# Scores are rounded to one decimal between 0 (skipped) and 10
+SCORE_RESOLUTION = 0.1
+SCORE_MAX = 10.0
+
+# Quantiles reported for each score distribution
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+_ROLE_COUNTERS = ("started", "completed", "attempts", "accepted", "rejected", "skipped")
+
+
+class ScoreSketch:
+    """Mergeable quantile sketch for scores on a fixed 0..SCORE_MAX scale.
+
+    Scores fall into bins of ``SCORE_RESOLUTION``; adding a score is one
+    increment and merging two sketches adds their bins, so per-worker
+    sketches combine into exactly the sketch of all their scores. Callers
+    pass scores rounded to the bin width (answer scores come rounded from
+    the evaluator; final scores are rounded as the API reports them), so
+    quantiles are exact for those values; anything finer is binned to the
+    nearest 0.1. A quantile query costs one pass over the fixed number of
+    bins however many scores were added.
+    """
+
+    __slots__ = ("bins", "count", "total")
+
+    def __init__(self, bins=None, total=0.0):
+        self.bins = bins or [0] * (round(SCORE_MAX / SCORE_RESOLUTION) + 1)
+        self.count = sum(self.bins)
+        self.total = total
+
+    def add(self, score):
+        index = min(len(self.bins) - 1, max(0, round(score / SCORE_RESOLUTION)))
+        self.bins[index] += 1
+        self.count += 1
+        self.total += score
+
+    def merge(self, other):
+        for index, value in enumerate(other.bins):
+            self.bins[index] += value
+        self.count += other.count
+        self.total += other.total
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index, value in enumerate(self.bins):
+            seen += value
+            if seen > rank:
+                return round(index * SCORE_RESOLUTION, 1)
+        return SCORE_MAX
+
+    def to_dict(self):
+        return {"bins": list(self.bins), "total": self.total}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(list(data["bins"]), data["total"])
+
+
+class _RoleStats:
+    __slots__ = _ROLE_COUNTERS + ("answer_scores", "final_scores")
+
+    def __init__(self):
+        for name in _ROLE_COUNTERS:
+            setattr(self, name, 0)
+        self.answer_scores = ScoreSketch()
+        self.final_scores = ScoreSketch()
+
+
+class InterviewAnalytics:
+    """Running interview statistics, updated in O(1) per event.
+
+    Per role it counts interviews started and completed, answers accepted
+    and rejected (a rejection means the candidate has to retry) and
+    questions skipped, and keeps score sketches for every answer and for
+    final interview scores. Per question it counts attempts, acceptances,
+    rejections, skips and the score total, from which its difficulty is
+    derived. Reads cost O(roles + questions), independent of how many
+    sessions there have been.
+
+    Counters are per process. ``snapshot`` returns them as plain data that
+    ``merge`` adds together; when ``shared_dir`` is set, each worker writes
+    its snapshot there every ``flush_interval`` seconds and ``report``
+    merges the snapshots of every worker.
+
+    Each process writes its own ``analytics-<pid>-<random>.json``, so a new
+    worker that reuses a dead one's PID cannot overwrite its totals. Files
+    of workers that have exited keep counting. When a worker starts, it
+    retires files nobody has written for ``retire_after`` seconds: it claims
+    each by renaming it (so only one worker takes it), adds its counters to
+    its own and deletes it. The directory therefore holds about one file per
+    live worker. A worker whose file was retired while it was still alive
+    (it stopped flushing for that long) starts its counters afresh rather
+    than count them twice.
+    """
+
+    def __init__(self, shared_dir=None, flush_interval=10, retire_after=3600):
+        self.shared_dir = shared_dir
+        self.flush_interval = flush_interval
+        self.retire_after = retire_after
+        self._lock = threading.Lock()
+        self._roles = {}
+        # role -> question -> [attempts, accepted, rejected, skipped, score total]
+        self._questions = {}
+        self._flusher = None
+        self._stop = threading.Event()
+        # Snapshot file name, chosen per process; see _path
+        self._file_pid = None
+        self._file_name = None
+        self._written = False
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Build analytics configured from ANALYTICS_* environment variables"""
+        return cls(
+            shared_dir=os.environ.get("ANALYTICS_DIR") or None,
+            flush_interval=float(os.environ.get("ANALYTICS_FLUSH_INTERVAL", 10)),
+            retire_after=float(os.environ.get("ANALYTICS_RETIRE_AFTER", 3600)),
+        )
+
+    def _role(self, role):
+        stats = self._roles.get(role)
+        if stats is None:
+            stats = self._roles[role] = _RoleStats()
+        return stats
+
+    def _question(self, role, question):
+        questions = self._questions.setdefault(role, {})
+        counts = questions.get(question)
+        if counts is None:
+            counts = questions[question] = [0, 0, 0, 0, 0.0]
+        return counts
+
+    def started(self, role):
+        with self._lock:
+            self._role(role).started += 1
+
+    def answered(self, role, question, score, accepted):
+        with self._lock:
+            stats = self._role(role)
+            stats.attempts += 1
+            stats.answer_scores.add(score)
+            counts = self._question(role, question)
+            counts[0] += 1
+            counts[4] += score
+            if accepted:
+                stats.accepted += 1
+                counts[1] += 1
+            else:
+                stats.rejected += 1
+                counts[2] += 1
+
+    def skipped(self, role, question):
+        with self._lock:
+            self._role(role).skipped += 1
+            self._question(role, question)[3] += 1
+
+    def completed(self, role, final_score):
+        with self._lock:
+            stats = self._role(role)
+            stats.completed += 1
+            stats.final_scores.add(final_score)
+
+    def snapshot(self):
+        """This process's counters as JSON-serializable data"""
+        with self._lock:
+            return {
+                "roles": {
+                    role: dict(
+                        {name: getattr(stats, name) for name in _ROLE_COUNTERS},
+                        answer_scores=stats.answer_scores.to_dict(),
+                        final_scores=stats.final_scores.to_dict(),
+                    )
+                    for role, stats in self._roles.items()
+                },
+                "questions": {role: {question: list(counts) for question, counts in questions.items()}
+                              for role, questions in self._questions.items()},
+            }
+
+    @staticmethod
+    def merge(snapshots):
+        """Add snapshots (from several workers) into one"""
+        roles = {}
+        questions = {}
+        for snapshot in snapshots:
+            for role, data in snapshot["roles"].items():
+                merged = roles.get(role)
+                if merged is None:
+                    roles[role] = merged = dict(data, answer_scores=ScoreSketch.from_dict(data["answer_scores"]),
+                                                final_scores=ScoreSketch.from_dict(data["final_scores"]))
+                    continue
+                for name in _ROLE_COUNTERS:
+                    merged[name] += data[name]
+                merged["answer_scores"].merge(ScoreSketch.from_dict(data["answer_scores"]))
+                merged["final_scores"].merge(ScoreSketch.from_dict(data["final_scores"]))
+            for role, role_questions in snapshot["questions"].items():
+                target = questions.setdefault(role, {})
+                for question, counts in role_questions.items():
+                    existing = target.get(question)
+                    if existing is None:
+                        target[question] = list(counts)
+                    else:
+                        for index, value in enumerate(counts):
+                            existing[index] += value
+        for data in roles.values():
+            data["answer_scores"] = data["answer_scores"].to_dict()
+            data["final_scores"] = data["final_scores"].to_dict()
+        return {"roles": roles, "questions": questions}
+
+    def add_snapshot(self, snapshot):
+        """Add another worker's snapshot to this process's counters"""
+        with self._lock:
+            for role, data in snapshot["roles"].items():
+                stats = self._role(role)
+                for name in _ROLE_COUNTERS:
+                    setattr(stats, name, getattr(stats, name) + data[name])
+                stats.answer_scores.merge(ScoreSketch.from_dict(data["answer_scores"]))
+                stats.final_scores.merge(ScoreSketch.from_dict(data["final_scores"]))
+            for role, role_questions in snapshot["questions"].items():
+                for question, counts in role_questions.items():
+                    existing = self._question(role, question)
+                    for index, value in enumerate(counts):
+                        existing[index] += value
+
+    def _reset(self):
+        with self._lock:
+            self._roles = {}
+            self._questions = {}
+
+    def _path(self):
+        # A fresh name per process, also in a worker forked after this was created
+        if self._file_pid != os.getpid():
+            self._file_pid = os.getpid()
+            self._file_name = f"analytics-{self._file_pid}-{uuid.uuid4().hex[:12]}.json"
+            self._written = False
+        return os.path.join(self.shared_dir, self._file_name)
+
+    def flush(self):
+        """Write this worker's snapshot to the shared directory"""
+        if not self.shared_dir:
+            return
+        path = self._path()
+        if self._written and not os.path.exists(path):
+            # Another worker retired our file and already counts what it held
+            logging.warning(f"Analytics snapshot {path} was retired while in use; starting counters afresh")
+            self._reset()
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(path + ".tmp", path)
+        self._written = True
+
+    def retire_stale(self):
+        """Fold snapshot files not written for retire_after seconds into this worker's; returns how many"""
+        if not self.shared_dir:
+            return 0
+        own = self._path()
+        now = time.time()
+        retired = 0
+        for path in glob.glob(os.path.join(self.shared_dir, "analytics-*.json")):
+            if path == own:
+                continue
+            try:
+                if now - os.stat(path).st_mtime < self.retire_after:
+                    continue
+                claimed = path + ".retiring"
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                # Retired by another worker first
+                continue
+            try:
+                with open(claimed) as f:
+                    self.add_snapshot(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Leaving unreadable analytics snapshot {claimed}: {str(e)}")
+                continue
+            self.flush()
+            os.remove(claimed)
+            retired += 1
+        return retired
+
+    def collect(self):
+        """Merged snapshot of every worker (just this one without a shared directory)"""
+        if not self.shared_dir:
+            return self.snapshot()
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.shared_dir, "analytics-*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping unreadable analytics snapshot {path}: {str(e)}")
+        return self.merge(snapshots)
+
+    def report(self):
+        """Dashboard figures: per-role averages and rates, per-question difficulty"""
+        return build_report(self.collect())
+
+    def start_flusher(self):
+        """Periodically write this worker's snapshot when a shared directory is set"""
+        if not self.shared_dir or self._flusher is not None:
+            return
+        try:
+            self.retire_stale()
+        except Exception as e:
+            logging.error(f"Retiring stale analytics snapshots failed: {str(e)}")
+        self._flusher = threading.Thread(target=self._flush_loop, name="analytics-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop_flusher(self):
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+            self.flush()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Analytics flush failed: {str(e)}")
+
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _distribution(data):
+    sketch = ScoreSketch.from_dict(data)
+    mean = sketch.mean()
+    return {
+        "count": sketch.count,
+        "mean": round(mean, 2) if mean is not None else None,
+        "quantiles": {f"p{round(q * 100)}": sketch.quantile(q) for q in QUANTILES},
+    }
+
+
+def build_report(snapshot):
+    roles = {}
+    for role, data in sorted(snapshot["roles"].items()):
+        answered = data["accepted"] + data["skipped"]
+        roles[role] = {
+            "interviews_started": data["started"],
+            "interviews_completed": data["completed"],
+            "completion_rate": _rate(data["completed"], data["started"]),
+            "average_final_score": _distribution(data["final_scores"])["mean"],
+            "retry_rate": _rate(data["rejected"], data["attempts"]),
+            "skip_rate": _rate(data["skipped"], answered),
+            "answer_scores": _distribution(data["answer_scores"]),
+            "final_scores": _distribution(data["final_scores"]),
+        }
+    questions = []
+    for role, role_questions in sorted(snapshot["questions"].items()):
+        for question, (attempts, accepted, rejected, skipped, score_total) in role_questions.items():
+            presented = accepted + skipped
+            questions.append({
+                "role": role,
+                "question": question,
+                "attempts": attempts,
+                "skips": skipped,
+                "average_score": round(score_total / attempts, 2) if attempts else None,
+                "retry_rate": _rate(rejected, attempts),
+                "skip_rate": _rate(skipped, presented),
+                # Share of tries that did not clear the question: rejections plus skips
+                "difficulty": _rate(rejected + skipped, attempts + skipped),
+            })
+    questions.sort(key=lambda entry: (entry["difficulty"] is None, -(entry["difficulty"] or 0)))
+    return {"roles": roles, "questions": questions}
@@ -0,0 +1,271 @@
+"""Native ASGI version of the interview API.
+
+Serves the same five ``/api/*`` endpoints as the Flask app in app.py, with
+the same request and response shapes, on top of the shared InterviewService.
+Answers are scored through the evaluator's ``evaluate_async`` so a slow
+(remote) evaluator is awaited without blocking the event loop. Run with::
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import logging
+import mimetypes
+import os
+import time
+from contextlib import asynccontextmanager
+
+import anyio
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from fastapi.staticfiles import StaticFiles
+
+from admission import AdmissionControl, rejection_message
+from analytics import InterviewAnalytics
+from evaluators import create_evaluator
+from interview import InterviewError, InterviewService, InterviewSession
+from journal import SessionJournal
+from json_provider import load_backend
+from metrics import CONTENT_TYPE, InterviewMetrics, SamplingProfiler, TimedEvaluator
+from question_audio import AUDIO_MAX_AGE, AUDIO_NAME, QuestionAudio
+from session_store import SessionStore, create_session_store
+from static_assets import ASSET_MAX_AGE, StaticAssets
+from structured_logging import configure_logging, log_request, start_request
+
+configure_logging()
+
+interview_sessions = create_session_store(InterviewSession)
+
+session_journal = None
+if os.environ.get("JOURNAL_DIR"):
+    session_journal = SessionJournal.from_env(interview_sessions)
+    restored = session_journal.restore(interview_sessions, interview_sessions.idle_ttl, interview_sessions.completed_ttl)
+    logging.info(f"Restored {restored} interview sessions from the journal")
+
+admission = AdmissionControl.from_env()
+
+evaluator = create_evaluator()
+
+metrics = InterviewMetrics(interview_sessions, admission, evaluator)
+
+question_audio = QuestionAudio.from_env()
+
+static_assets = StaticAssets.from_env()
+
+analytics = InterviewAnalytics.from_env()
+
+interview = InterviewService(
+    interview_sessions,
+    TimedEvaluator(evaluator, metrics.evaluation_duration),
+    session_journal,
+    question_audio,
+    analytics,
+)
+
+profiler = SamplingProfiler() if os.environ.get("PROFILER_ENABLED") else None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    interview_sessions.start_sweeper()
+    if session_journal is not None:
+        session_journal.start()
+    analytics.start_flusher()
+    yield
+    analytics.stop_flusher()
+    if session_journal is not None:
+        session_journal.close()
+
+
+# Service calls block on disk when sessions live in SQLite, or when every
+# mutation waits for a group-commit journal fsync
+_blocking_sessions = not isinstance(interview_sessions, SessionStore) or (
+    session_journal is not None and session_journal.sync_mode == "group"
+)
+
+
+async def _run(fn, *args):
+    """Run a service call without blocking the event loop.
+
+    Calls that may block (see _blocking_sessions) are moved to a worker
+    thread; with in-memory sessions they are cheap enough to run inline.
+    Evaluation cache lookups in a shared SQLite file are offloaded by
+    CachedEvaluator itself.
+    """
+    if _blocking_sessions:
+        return await anyio.to_thread.run_sync(fn, *args)
+    return fn(*args)
+
+
+app = FastAPI(title="Voice Interview Bot", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")), name="static")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    start_request()
+    response = await call_next(request)
+    # The router records the matched route in the scope; label by its template
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", None) or "unmatched"
+    metrics.observe_request(endpoint, request.method, response.status_code, time.perf_counter() - started)
+    log_request(endpoint, request.method, response.status_code, started)
+    return response
+
+
+json_backend = load_backend()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with the same backend as the Flask app"""
+
+    def render(self, content):
+        return json_backend.dumps(content)
+
+
+def _reject(request):
+    """Admit the request, or return the 429/503 response to send instead"""
+    client = admission.client_id(request.headers, request.client.host if request.client else None)
+    rejection = admission.admit(client, request.url.path)
+    if rejection is None:
+        return None
+    return FastJSONResponse({"error": rejection_message(rejection)}, status_code=rejection.status,
+                            headers={"Retry-After": str(rejection.retry_after)})
+
+
+async def _call(handler, request, failure_message, log_message):
+    rejected = _reject(request)
+    if rejected is not None:
+        return rejected
+    try:
+        return FastJSONResponse(await handler(json_backend.loads(await request.body())))
+    except InterviewError as e:
+        return FastJSONResponse({"error": e.message}, status_code=e.status)
+    except Exception as e:
+        logging.error(f"{log_message}: {str(e)}")
+        return FastJSONResponse({"error": failure_message}, status_code=500)
+    finally:
+        admission.release(request.url.path)
+
+
+async def _start_interview(data):
+    return await _run(interview.start_interview, data)
+
+
+async def _submit_answer(data):
+    pending = await _run(interview.begin_answer, data)
+    evaluation = await interview.evaluator.evaluate_async(pending.question, pending.answer, pending.session.role)
+    return await _run(interview.finish_answer, pending, evaluation)
+
+
+async def _skip_question(data):
+    return await _run(interview.skip_question, data)
+
+
+async def _cancel_interview(data):
+    return await _run(interview.cancel_interview, data)
+
+
+async def _get_summary(data):
+    return await _run(interview.get_summary, data)
+
+
+@app.post("/api/start-interview")
+async def start_interview(request: Request):
+    """Start a new interview session"""
+    return await _call(_start_interview, request, "Failed to start interview", "Error starting interview")
+
+
+@app.post("/api/submit-answer")
+async def submit_answer(request: Request):
+    """Submit an answer and get the next question"""
+    return await _call(_submit_answer, request, "Failed to submit answer", "Error submitting answer")
+
+
+@app.post("/api/skip-question")
+async def skip_question(request: Request):
+    """Skip the current question and go to the next one"""
+    return await _call(_skip_question, request, "Failed to skip question", "Error skipping question")
+
+
+@app.post("/api/cancel-interview")
+async def cancel_interview(request: Request):
+    """Cancel an ongoing interview session"""
+    return await _call(_cancel_interview, request, "Failed to cancel interview", "Error cancelling interview")
+
+
+@app.post("/api/get-summary")
+async def get_summary(request: Request):
+    """Get interview summary and detailed feedback"""
+    return await _call(_get_summary, request, "Failed to get summary", "Error getting summary")
+
+
+@app.get("/api/question-audio/{name}.wav")
+async def question_audio_file(name: str, request: Request):
+    """Serve pre-rendered question audio; files are content-addressed and never change"""
+    path = question_audio.path(name)
+    if not AUDIO_NAME.match(name) or not os.path.exists(path):
+        return JSONResponse({"error": "Audio not found"}, status_code=404)
+    etag = f'"{name}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={AUDIO_MAX_AGE}, immutable"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="audio/wav", headers=headers)
+
+
+@app.get("/assets/{name:path}")
+async def static_asset(name: str, request: Request):
+    """Serve a built asset, precompressed when the client accepts it; they are never modified"""
+    selected = static_assets.select(name, request.headers.get("accept-encoding", ""))
+    if selected is None or not os.path.exists(selected[0]):
+        return JSONResponse({"error": "Asset not found"}, status_code=404)
+    path, encoding = selected
+    etag = f'"{name}:{encoding or "identity"}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={ASSET_MAX_AGE}, immutable", "Vary": "Accept-Encoding"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type=mimetypes.guess_type(name)[0], headers=headers)
+
+
+@app.get("/api/analytics")
+async def analytics_report(request: Request):
+    """Average scores, retry and skip rates by role and difficulty by question"""
+    rejected = _reject(request)
+    if rejected is not None:
+        return rejected
+    try:
+        if analytics.shared_dir:
+            # Reads every worker's snapshot file
+            return FastJSONResponse(await anyio.to_thread.run_sync(analytics.report))
+        return FastJSONResponse(analytics.report())
+    except Exception as e:
+        logging.error(f"Error building analytics: {str(e)}")
+        return FastJSONResponse({"error": "Failed to build analytics"}, status_code=500)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text-format metrics for this worker"""
+    # Session counts are SQLite queries with the shared backend
+    return PlainTextResponse(await _run(metrics.render), media_type=CONTENT_TYPE)
+
+
+@app.post("/debug/profiler")
+async def toggle_profiler(request: Request):
+    """Start or stop the sampling profiler; stopping returns collapsed stacks"""
+    if profiler is None:
+        return JSONResponse({"error": "Profiler is disabled"}, status_code=404)
+
+    try:
+        action = (await request.json()).get("action")
+    except Exception:
+        action = None
+    if action == "start":
+        profiler.start()
+        return JSONResponse({"running": True})
+    if action == "stop":
+        return PlainTextResponse(await anyio.to_thread.run_sync(profiler.stop))
+    return JSONResponse({"error": "Action must be 'start' or 'stop'"}, status_code=400)
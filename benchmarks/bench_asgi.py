@@ -0,0 +1,163 @@
+"""Flask (gunicorn gthread) vs. ASGI (uvicorn) under 1k concurrent candidates.
+
+Each simulated candidate runs start -> submit x5 -> summary with its own
+connection, all candidates at once. ``--eval-delay`` adds a delay to
+every evaluation to model a slow evaluator: a blocking sleep for the sync
+path Flask uses and an awaited sleep for the async path the ASGI app uses,
+as a remote model call would behave. Run from the repository root:
+
+    python benchmarks/bench_asgi.py --candidates 1000 --eval-delay 0.05
+"""
+import argparse
+import asyncio
+import os
+import socket
+import ssl
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# All candidates share one address and far more than EVALUATION_CONCURRENCY
+# answers are in flight, so admission control would shed most of the load
+SERVER_ENV = dict(os.environ, RATE_LIMITS="off", EVALUATION_CONCURRENCY="0", LOG_LEVEL="WARNING")
+
+SSL_CONTEXT = ssl.create_default_context()
+
+GOOD_ANSWER = (
+    "In my last project I developed a software framework for our team, wrote most of the code, "
+    "set up git version control, designed the database schema and the public api, and fixed a "
+    "hard bug while debugging the algorithm that handled technical scheduling."
+)
+
+
+class SlowEvaluator:
+    def __init__(self, evaluator, delay):
+        self.evaluator = evaluator
+        self.delay = delay
+
+    def evaluate(self, question, answer, role):
+        time.sleep(self.delay)
+        return self.evaluator.evaluate(question, answer, role)
+
+    async def evaluate_async(self, question, answer, role):
+        await asyncio.sleep(self.delay)
+        return self.evaluator.evaluate(question, answer, role)
+
+
+def serve(kind, port, delay, threads):
+    """Run one server in this process (used via --serve by the parent)"""
+    if kind == "asgi":
+        import uvicorn
+        import asgi
+        asgi.interview.evaluator = SlowEvaluator(asgi.interview.evaluator, delay)
+        uvicorn.run(asgi.app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+        return
+
+    from gunicorn.app.base import BaseApplication
+    import app as flask_app
+    flask_app.interview.evaluator = SlowEvaluator(flask_app.interview.evaluator, delay)
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"127.0.0.1:{port}")
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("workers", 1)
+            self.cfg.set("threads", threads)
+            self.cfg.set("backlog", 4096)
+            # Every candidate holds a keep-alive connection; the default cap is 1000
+            self.cfg.set("worker_connections", 4096)
+            self.cfg.set("keepalive", 120)
+            self.cfg.set("loglevel", "warning")
+
+        def load(self):
+            return flask_app.app
+
+    Server().run()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def candidate(port, latencies):
+    # A client per candidate: one shared pool of 1k connections makes httpx
+    # scan every connection for each request and bottlenecks the benchmark.
+    # They share an SSL context, which is expensive to build and unused here.
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, verify=SSL_CONTEXT) as client:
+        await interview(client, latencies)
+
+
+async def interview(client, latencies):
+    async def post(path, payload):
+        start = time.perf_counter()
+        response = await client.post(path, json=payload)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response.json()
+
+    started = await post("/api/start-interview", {"role": "software_engineer"})
+    for _ in range(started["total_questions"]):
+        await post("/api/submit-answer", {"session_id": started["session_id"], "answer": GOOD_ANSWER})
+    await post("/api/get-summary", {"session_id": started["session_id"]})
+
+
+async def drive(port, candidates):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(candidate(port, latencies) for _ in range(candidates)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--eval-delay", type=float, default=0.05)
+    parser.add_argument("--threads", type=int, default=64, help="gthread threads for the Flask server")
+    parser.add_argument("--serve", choices=["flask", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.eval_delay, args.threads)
+        return
+
+    print(f"{'server':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind in ("flask", "asgi"):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        server = subprocess.Popen(
+            [sys.executable, __file__, "--serve", kind, "--port", str(port),
+             "--eval-delay", str(args.eval_delay), "--threads", str(args.threads)],
+            cwd=ROOT, env=SERVER_ENV,
+        )
+        try:
+            wait_for_port(port)
+            rps, latencies = asyncio.run(drive(port, args.candidates))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{kind:>6} {rps:>8.0f} {percentile(latencies, 50) * 1000:>8.1f} "
+              f"{percentile(latencies, 95) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
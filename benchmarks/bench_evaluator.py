@@ -0,0 +1,66 @@
+"""RemoteEvaluator against the fake model server at several injected delays.
+
+For each delay, fires ``--calls`` concurrent evaluations through
+``evaluate_async`` and reports latency percentiles, how many fell back to the
+heuristic and how many HTTP batches were sent. Run from the repository root:
+
+    python benchmarks/bench_evaluator.py --budget 0.5 --calls 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluators import RemoteEvaluator  # noqa: E402
+from fake_model_server import start_fake_server  # noqa: E402
+
+ANSWER = (
+    "In my last project I developed a software framework for our team, wrote most of the code "
+    "and fixed a hard bug while debugging the algorithm."
+)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def fire(evaluator, calls):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await evaluator.evaluate_async("Describe a project.", ANSWER, "software_engineer")
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.5)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--delays", default="0.01,0.1,0.3,0.6,1.0")
+    args = parser.parse_args()
+
+    print(f"{'delay s':>8} {'p50 ms':>8} {'p99 ms':>8} {'remote':>7} {'fallback':>9} {'batches':>8}")
+    for delay in (float(d) for d in args.delays.split(",")):
+        server = start_fake_server(delay=delay, jitter=delay / 10)
+        evaluator = RemoteEvaluator(server.url, budget=args.budget, concurrency=args.concurrency,
+                                    batch_size=args.batch_size)
+        latencies = asyncio.run(fire(evaluator, args.calls))
+        stats = evaluator.stats()
+        server.shutdown()
+        fallbacks = stats["fallback_timeout"] + stats["fallback_error"]
+        print(f"{delay:>8.2f} {percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>8.1f} "
+              f"{stats['remote']:>7} {fallbacks:>9} {stats['batches']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""submit-answer latency with the session journal disabled, async and group-commit.
+
+Drives InterviewService directly (no HTTP) from ``--threads`` concurrent
+threads so the numbers isolate journaling cost. The journal is written to
+``--dir`` (default: a temporary directory; point it at the real data disk
+for representative fsync times). Run from the repository root:
+
+    python benchmarks/bench_journal.py --threads 16 --interviews 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interview import InterviewService  # noqa: E402
+from journal import SessionJournal  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+
+GOOD_ANSWER = (
+    "In my last project I developed a software framework for our team, wrote most of the code, "
+    "set up git version control, designed the database schema and the public api, and fixed a "
+    "hard bug while debugging the algorithm that handled technical scheduling."
+)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(mode, threads, interviews, directory):
+    store = SessionStore(max_sessions=interviews * 2)
+    journal = None
+    if mode != "disabled":
+        journal = SessionJournal(directory, sync_mode=mode, snapshot_source=store.items)
+        journal.start()
+    service = InterviewService(store, journal=journal)
+    latencies = [[] for _ in range(threads)]
+
+    def worker(index):
+        for _ in range(index, interviews, threads):
+            session_id = service.start_interview({"role": "software_engineer"})["session_id"]
+            for _ in range(5):
+                start = time.perf_counter()
+                service.submit_answer({"session_id": session_id, "answer": GOOD_ANSWER})
+                latencies[index].append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if journal is not None:
+        journal.close()
+    flat = [value for per_thread in latencies for value in per_thread]
+    return len(flat) / elapsed, flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--dir", help="directory to write journals under")
+    args = parser.parse_args()
+
+    print(f"{'journal':>9} {'submits/s':>10} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8}")
+    for mode in ("disabled", "async", "group"):
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            rate, latencies = run(mode, args.threads, args.interviews, directory)
+        print(f"{mode:>9} {rate:>10.0f} {percentile(latencies, 50) * 1e6:>8.0f} "
+              f"{percentile(latencies, 95) * 1e6:>8.0f} {percentile(latencies, 99) * 1e6:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Encode/decode cost of summary payloads for each JSON backend.
+
+Builds get-summary responses whose detailed_results carry answers of
+``--words`` words each (long spoken transcripts, with some non-ASCII text)
+and times, per backend, encoding them the way the Flask app's JSON
+provider does and decoding them again. ``flask-default`` is Flask's stdlib
+provider as used before. Run from the repository root:
+
+    python benchmarks/bench_json.py --words 50 200 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from interview import QUESTION_BANK  # noqa: E402
+from json_provider import BACKEND_PREFERENCE, FastJSONProvider, load_backend  # noqa: E402
+from scoring import evaluate_answer  # noqa: E402
+
+VOCABULARY = (
+    "project team code database api customer design we I built tested shipped improved "
+    "performance latency users feedback roadmap metrics café naïve résumé"
+).split()
+
+
+def summary_payload(words, rng):
+    role = "software_engineer"
+    pool = QUESTION_BANK.pool(role)
+    results = []
+    for question in rng.sample(pool.questions, 5):
+        answer = " ".join(rng.choice(VOCABULARY) for _ in range(words))
+        evaluation = evaluate_answer(question, answer, role)
+        results.append({"question": question, "answer": answer,
+                        "score": evaluation["score"], "feedback": evaluation["feedback"]})
+    return {
+        "role": role,
+        "final_score": 7.4,
+        "total_questions": 5,
+        "overall_feedback": "Good performance overall. You showed relevant experience and knowledge.",
+        "detailed_results": results,
+        "duration": "2025-07-12T10:15:42.123456",
+        "started_at": "2025-07-12T10:02:03.654321",
+    }
+
+
+def best_of(fn, repeat, number):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[50, 200, 1000], help="words per answer")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {"flask-default": DefaultJSONProvider(app)}
+    for name in BACKEND_PREFERENCE:
+        try:
+            providers[name] = FastJSONProvider(app, load_backend(name))
+        except ImportError:
+            print(f"{name} is not installed, skipping")
+
+    rng = random.Random(0)
+    print(f"{'words':>6} {'bytes':>8} {'backend':>14} {'encode us':>10} {'decode us':>10} {'vs default':>11}")
+    for words in args.words:
+        payload = summary_payload(words, rng)
+        baseline = None
+        for name, provider in providers.items():
+            if isinstance(provider, FastJSONProvider):
+                encode = lambda: provider._dumps_bytes(payload)  # noqa: E731
+            else:
+                # What DefaultJSONProvider.response does: str dumps, then encode for the body
+                encode = lambda: f"{provider.dumps(payload, separators=(',', ':'))}\n".encode()  # noqa: E731
+            body = encode()
+            assert provider.loads(body) == payload
+            encode_time = best_of(encode, args.repeat, args.number)
+            decode_time = best_of(lambda: provider.loads(body), args.repeat, args.number)
+            total = encode_time + decode_time
+            baseline = baseline or total
+            print(f"{words:>6} {len(body):>8} {name:>14} {encode_time * 1e6:>10.1f} "
+                  f"{decode_time * 1e6:>10.1f} {baseline / total:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
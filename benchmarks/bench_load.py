@@ -0,0 +1,331 @@
+"""End-to-end load test of the interview API with baseline comparison.
+
+Drives realistic interviews against app.py: start-interview, then for each
+question either a skip or a submit-answer that is sometimes unsatisfactory
+first (forcing a retry) and then satisfactory, and finally get-summary. By
+default requests go through the Flask test client in this process, so no
+network or server is needed; ``--url`` points it at a running server
+instead (give that server ``RATE_LIMITS=off`` or limits above the load).
+Reports throughput, p50/p95/p99 latency per endpoint and resident
+memory growth per 10k sessions (of this process, or of ``--pid`` when
+driving a server).
+
+Results can be written as JSON with ``--save`` and checked against an
+earlier run with ``--compare``, which exits non-zero when throughput drops
+or a p95 latency rises by more than ``--tolerance``. Run from the
+repository root:
+
+    python benchmarks/bench_load.py --interviews 5000 --save baseline.json
+    python benchmarks/bench_load.py --interviews 5000 --compare baseline.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = ("start-interview", "submit-answer", "skip-question", "get-summary")
+
+# Answers that pass the heuristic evaluator for each role
+GOOD_ANSWERS = {
+    "software_engineer": (
+        "In my last project I developed a software framework for our team, wrote most of the code, "
+        "set up git version control, designed the database schema and the public api, and fixed a "
+        "hard bug while debugging the algorithm that handled technical scheduling."
+    ),
+    "data_scientist": (
+        "In one project I led the data analysis for a churn model, cleaned a large dataset in python, "
+        "compared regression and classification approaches with proper statistics, and built a "
+        "visualization dashboard so the analytics team could follow the results."
+    ),
+    "product_manager": (
+        "In my experience as a product owner I managed the roadmap for a payments feature, talked to "
+        "every customer segment, agreed the priority of each requirement with stakeholders and "
+        "tracked adoption metrics after launch to confirm we had the right user focus."
+    ),
+    "marketing_manager": (
+        "For example, I managed a digital marketing campaign to relaunch our brand, defined the target "
+        "audience, ran paid and social media channels, and used analytics to report a strong roi back "
+        "to leadership so the strategy could be refined for the next quarter."
+    ),
+    "sales_representative": (
+        "In my last role I managed a pipeline of enterprise client accounts in our crm, built a strong "
+        "relationship with each customer, led the negotiation on renewals and consistently closed "
+        "deals above my revenue target through careful closing conversations."
+    ),
+}
+
+BAD_ANSWERS = ("I'm not sure.", "I would have to think about that.", "Yes, I have done that before.")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def rss_bytes(pid="self"):
+    """Current resident set size of a process (Linux /proc)"""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class ClientTransport:
+    """Calls the Flask app in-process through its test client"""
+
+    def __init__(self):
+        # Every simulated candidate shares the test client's address, so
+        # per-client rate limits would shed most of the load
+        os.environ.setdefault("RATE_LIMITS", "off")
+        from app import app
+
+        self.client = app.test_client()
+
+    def post(self, path, payload):
+        response = self.client.post(path, json=payload)
+        return response.status_code, response.get_json()
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """Calls a running server over one keep-alive HTTP connection"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+
+    def post(self, path, payload):
+        self.conn.request("POST", path, body=json.dumps(payload), headers={"Content-Type": "application/json"})
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def close(self):
+        self.conn.close()
+
+
+class LoadRunner:
+    """Runs interviews from a pool of client threads and records latencies"""
+
+    def __init__(self, make_transport, bad_rate=0.3, skip_rate=0.2, seed=0):
+        self.make_transport = make_transport
+        self.bad_rate = bad_rate
+        self.skip_rate = skip_rate
+        self.seed = seed
+        self.roles = sorted(GOOD_ANSWERS)
+
+    def _call(self, transport, endpoint, payload, latencies):
+        start = time.perf_counter()
+        status, body = transport.post("/api/" + endpoint, payload)
+        latencies[endpoint].append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{endpoint} returned {status}: {body}")
+        return body
+
+    def interview(self, transport, rng, latencies):
+        """One full interview; returns the number of requests made"""
+        role = rng.choice(self.roles)
+        started = self._call(transport, "start-interview", {"role": role}, latencies)
+        session_id = started["session_id"]
+        calls = 1
+        # Skip at least one question per interview, plus more at random
+        forced_skip = rng.randrange(started["total_questions"])
+        for index in range(started["total_questions"]):
+            calls += 1
+            if index == forced_skip or rng.random() < self.skip_rate:
+                self._call(transport, "skip-question", {"session_id": session_id}, latencies)
+                continue
+            if rng.random() < self.bad_rate:
+                result = self._call(transport, "submit-answer",
+                                    {"session_id": session_id, "answer": rng.choice(BAD_ANSWERS)}, latencies)
+                if result["is_satisfactory"]:
+                    raise RuntimeError("unsatisfactory answer was accepted")
+                calls += 1
+            result = self._call(transport, "submit-answer",
+                                {"session_id": session_id, "answer": GOOD_ANSWERS[role]}, latencies)
+            if not result["is_satisfactory"]:
+                raise RuntimeError(f"satisfactory answer was rejected for {role}")
+        self._call(transport, "get-summary", {"session_id": session_id}, latencies)
+        return calls + 1
+
+    def run(self, interviews, threads, rss=None, rss_every=1000):
+        latencies = [{endpoint: [] for endpoint in ENDPOINTS} for _ in range(threads)]
+        calls = [0] * threads
+        done = [0] * threads
+        rss_samples = []
+        errors = []
+
+        def worker(index):
+            rng = random.Random(self.seed * 1000003 + index)
+            transport = self.make_transport()
+            try:
+                for _ in range(index, interviews, threads):
+                    calls[index] += self.interview(transport, rng, latencies[index])
+                    done[index] += 1
+            except Exception as e:
+                errors.append(e)
+            finally:
+                transport.close()
+
+        def sample_rss(stop):
+            while not stop.wait(0.05):
+                completed = sum(done)
+                if not rss_samples or completed - rss_samples[-1][0] >= rss_every:
+                    rss_samples.append((completed, rss()))
+
+        stop = threading.Event()
+        sampler = None
+        if rss is not None:
+            rss_samples.append((0, rss()))
+            sampler = threading.Thread(target=sample_rss, args=(stop,), daemon=True)
+            sampler.start()
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if sampler is not None:
+            stop.set()
+            sampler.join()
+            rss_samples.append((sum(done), rss()))
+        if errors:
+            raise errors[0]
+
+        merged = {endpoint: [value for per_thread in latencies for value in per_thread[endpoint]]
+                  for endpoint in ENDPOINTS}
+        return summarize(merged, sum(calls), sum(done), elapsed, rss_samples)
+
+
+def summarize(latencies, calls, interviews, elapsed, rss_samples):
+    result = {
+        "interviews": interviews,
+        "requests": calls,
+        "elapsed_s": round(elapsed, 3),
+        "throughput": {
+            "requests_per_s": round(calls / elapsed, 1),
+            "interviews_per_s": round(interviews / elapsed, 1),
+        },
+        "latency_ms": {
+            endpoint: {
+                "count": len(values),
+                "p50": round(percentile(values, 50) * 1e3, 3),
+                "p95": round(percentile(values, 95) * 1e3, 3),
+                "p99": round(percentile(values, 99) * 1e3, 3),
+            }
+            for endpoint, values in latencies.items()
+        },
+    }
+    if len(rss_samples) >= 2 and interviews:
+        (first_n, first_rss), (last_n, last_rss) = rss_samples[0], rss_samples[-1]
+        result["rss"] = {
+            "start_mb": round(first_rss / 2**20, 1),
+            "end_mb": round(last_rss / 2**20, 1),
+            "growth_mb_per_10k_sessions": round((last_rss - first_rss) / 2**20 * 10000 / (last_n - first_n), 2),
+            "samples": [[n, round(value / 2**20, 1)] for n, value in rss_samples],
+        }
+    return result
+
+
+def report(result, log=sys.stdout):
+    throughput = result["throughput"]
+    log.write(f"{result['interviews']} interviews, {result['requests']} requests in {result['elapsed_s']:.2f}s: "
+              f"{throughput['requests_per_s']:.0f} req/s, {throughput['interviews_per_s']:.1f} interviews/s\n")
+    log.write(f"{'endpoint':>16} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}\n")
+    for endpoint, stats in result["latency_ms"].items():
+        log.write(f"{endpoint:>16} {stats['count']:>8} {stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['p99']:>8.3f}\n")
+    if "rss" in result:
+        rss = result["rss"]
+        log.write(f"RSS {rss['start_mb']:.1f} -> {rss['end_mb']:.1f} MB, "
+                  f"{rss['growth_mb_per_10k_sessions']:.2f} MB per 10k sessions\n")
+
+
+def compare(result, baseline, tolerance, log=sys.stdout):
+    """Print changes against a baseline; returns the list of regressions"""
+    regressions = []
+
+    def check(label, old, new, higher_is_better, gate=True):
+        if not old:
+            return
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = ""
+        if gate and worse > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(label)
+        log.write(f"{label:>28} {old:>10.3f} {new:>10.3f} {change:>+8.1%}{flag}\n")
+
+    log.write(f"{'metric':>28} {'baseline':>10} {'current':>10} {'change':>8}\n")
+    check("requests/s", baseline["throughput"]["requests_per_s"], result["throughput"]["requests_per_s"], True)
+    for endpoint, stats in result["latency_ms"].items():
+        old = baseline["latency_ms"].get(endpoint)
+        if old:
+            check(f"{endpoint} p95 ms", old["p95"], stats["p95"], False)
+            # p99 over a few thousand samples is too noisy to gate on
+            check(f"{endpoint} p99 ms", old["p99"], stats["p99"], False, gate=False)
+    if "rss" in result and "rss" in baseline:
+        log.write(f"{'MB per 10k sessions':>28} {baseline['rss']['growth_mb_per_10k_sessions']:>10.3f} "
+                  f"{result['rss']['growth_mb_per_10k_sessions']:>10.3f}\n")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: in-process Flask test client)")
+    parser.add_argument("--pid", type=int, help="server process to measure RSS of when using --url")
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50, help="interviews run before measuring")
+    parser.add_argument("--bad-rate", type=float, default=0.3, help="chance an answer is unsatisfactory first")
+    parser.add_argument("--skip-rate", type=float, default=0.2, help="chance each further question is skipped")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed relative regression")
+    args = parser.parse_args()
+
+    if args.url:
+        make_transport = lambda: HTTPTransport(args.url)  # noqa: E731
+        rss = (lambda: rss_bytes(args.pid)) if args.pid else None
+    else:
+        make_transport = ClientTransport
+        rss = rss_bytes
+
+    runner = LoadRunner(make_transport, args.bad_rate, args.skip_rate, args.seed)
+    if args.warmup:
+        runner.run(args.warmup, min(args.threads, args.warmup))
+    result = runner.run(args.interviews, args.threads, rss=rss)
+    result["config"] = {
+        "target": args.url or "flask-test-client",
+        "threads": args.threads,
+        "bad_rate": args.bad_rate,
+        "skip_rate": args.skip_rate,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "session_backend": os.environ.get("SESSION_BACKEND", "memory"),
+    }
+    report(result)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
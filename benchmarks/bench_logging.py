@@ -0,0 +1,122 @@
+"""Request latency with the old console logging vs the queue-based JSON logs.
+
+Starts app.py under werkzeug's threaded server twice: once logging as it
+used to (``logging.basicConfig`` at DEBUG, written synchronously by the
+request threads, werkzeug's per-request lines included) and once with
+``structured_logging.configure_logging``. Both servers are driven with the
+same interviews from bench_load.py, and throughput, latency per endpoint
+and log volume are compared.
+
+Server output goes to a file, or with ``--console-rate`` through a pipe
+drained at that many bytes per second, like a terminal or a log shipper
+that cannot keep up. Run from the repository root:
+
+    python benchmarks/bench_logging.py --interviews 2000 --threads 8
+    python benchmarks/bench_logging.py --console-rate 100000
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_load import HTTPTransport, LoadRunner, compare, report  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = """
+import logging, sys
+if sys.argv[2] == "before":
+    logging.basicConfig(level=logging.DEBUG)
+from werkzeug.serving import run_simple
+from app import app
+if sys.argv[2] == "before":
+    # The old setup had no request records of its own, only werkzeug's lines
+    logging.getLogger("interview.requests").disabled = True
+run_simple("127.0.0.1", int(sys.argv[1]), app, threaded=True)
+"""
+
+# Copies stdin to a file at no more than argv[2] bytes per second
+DRAIN = """
+import sys, time
+rate = int(sys.argv[2])
+with open(sys.argv[1], "wb") as out:
+    while chunk := sys.stdin.buffer.read1(4096):
+        out.write(chunk)
+        time.sleep(len(chunk) / rate)
+"""
+
+MODES = {"before": "basicConfig(DEBUG), synchronous", "after": "queue + JSON, background thread"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def measure(mode, args, log_path):
+    port = free_port()
+    env = dict(os.environ, RATE_LIMITS="off")
+    drain = None
+    if args.console_rate:
+        drain = subprocess.Popen([sys.executable, "-c", DRAIN, log_path, str(args.console_rate)],
+                                 stdin=subprocess.PIPE)
+        output = drain.stdin
+    else:
+        output = open(log_path, "w")
+    server = subprocess.Popen([sys.executable, "-c", SERVER, str(port), mode], cwd=ROOT, env=env,
+                              stdout=output, stderr=output)
+    output.close()
+    try:
+        wait_for(port)
+        runner = LoadRunner(lambda: HTTPTransport(f"http://127.0.0.1:{port}"), seed=args.seed)
+        runner.run(args.warmup, min(args.threads, args.warmup))
+        return runner.run(args.interviews, args.threads)
+    finally:
+        server.terminate()
+        server.wait()
+        if drain is not None:
+            drain.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--console-rate", type=int, help="drain server output at this many bytes/s")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, description in MODES.items():
+            log_path = os.path.join(tmp, f"{mode}.log")
+            results[mode] = measure(mode, args, log_path)
+            print(f"== {mode}: {description}")
+            report(results[mode])
+            with open(log_path, "rb") as f:
+                lines = sum(1 for _ in f)
+            print(f"log: {lines} lines, {os.path.getsize(log_path) / 2**20:.1f} MB\n")
+    print("== after vs before")
+    compare(results["after"], results["before"], tolerance=float("inf"))
+
+
+if __name__ == '__main__':
+    main()
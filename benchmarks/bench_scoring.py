@@ -0,0 +1,157 @@
+"""Micro-benchmark: compiled scoring engine vs. the original evaluate_answer.
+
+Run from the repository root:
+
+    python benchmarks/bench_scoring.py
+
+Every generated answer is also scored by both implementations and the
+results are compared, so a run doubles as an equivalence check.
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import ROLE_CRITERIA, EXAMPLE_INDICATORS, evaluate_answer  # noqa: E402
+
+FILLER = ("i", "the", "team", "we", "then", "because", "results", "improved",
+          "worked", "on", "with", "a", "and", "for", "during", "my", "role")
+
+
+# The original implementation, kept verbatim as the baseline
+def reference_evaluate_answer(question, answer, role):
+    """Enhanced evaluation that provides specific feedback and identifies issues"""
+    if not answer.strip():
+        return {
+            "score": 1,
+            "feedback": "No answer provided. Please provide a complete response to the question.",
+            "is_satisfactory": False,
+            "specific_issues": ["No response given"],
+            "improvement_suggestions": ["Please answer the question with specific examples and details"]
+        }
+    
+    # Role-specific evaluation criteria
+    role_criteria = {
+        "software_engineer": {
+            "keywords": ["code", "programming", "development", "algorithm", "bug", "debug", "git", "version", "software", "technical", "framework", "database", "api"],
+            "required_concepts": ["technical experience", "problem-solving", "tools/technologies"],
+            "min_words": 20
+        },
+        "data_scientist": {
+            "keywords": ["data", "analysis", "machine learning", "statistics", "python", "model", "dataset", "visualization", "analytics", "regression", "classification"],
+            "required_concepts": ["data analysis", "statistical methods", "tools/languages"],
+            "min_words": 20
+        },
+        "product_manager": {
+            "keywords": ["product", "roadmap", "feature", "user", "customer", "metrics", "stakeholder", "requirement", "priority", "market"],
+            "required_concepts": ["product strategy", "user focus", "decision-making"],
+            "min_words": 20
+        },
+        "marketing_manager": {
+            "keywords": ["marketing", "campaign", "brand", "customer", "digital", "social media", "analytics", "roi", "target", "strategy"],
+            "required_concepts": ["marketing strategy", "campaign experience", "measurement"],
+            "min_words": 20
+        },
+        "sales_representative": {
+            "keywords": ["sales", "customer", "client", "relationship", "revenue", "target", "crm", "negotiation", "closing", "pipeline"],
+            "required_concepts": ["sales experience", "customer relationships", "results/achievements"],
+            "min_words": 20
+        }
+    }
+    
+    criteria = role_criteria.get(role, role_criteria["software_engineer"])
+    answer_lower = answer.lower()
+    word_count = len(answer.split())
+    
+    # Check for keyword relevance
+    keyword_matches = sum(1 for keyword in criteria["keywords"] if keyword in answer_lower)
+    keyword_score = min(4, keyword_matches)
+    
+    # Check answer length
+    length_score = min(3, word_count / 10)
+    
+    # Check for specific examples
+    example_indicators = ["example", "project", "experience", "worked on", "implemented", "developed", "managed", "led"]
+    has_examples = any(indicator in answer_lower for indicator in example_indicators)
+    example_score = 2 if has_examples else 0
+    
+    # Calculate total score
+    total_score = keyword_score + length_score + example_score + 1  # Base score of 1
+    final_score = min(10, max(1, total_score))
+    
+    # Determine if answer is satisfactory
+    is_satisfactory = final_score >= 5 and word_count >= criteria["min_words"]
+    
+    # Generate specific feedback
+    issues = []
+    suggestions = []
+    
+    if word_count < criteria["min_words"]:
+        issues.append("Answer is too brief")
+        suggestions.append("Provide more detailed explanations and examples")
+    
+    if keyword_matches < 2:
+        issues.append(f"Missing relevant {role.replace('_', ' ')} terminology")
+        suggestions.append(f"Include specific {role.replace('_', ' ')} concepts and technologies")
+    
+    if not has_examples:
+        issues.append("No specific examples provided")
+        suggestions.append("Share concrete examples from your experience")
+    
+    # Generate contextual feedback
+    if final_score >= 8:
+        feedback = "Excellent answer! You provided relevant details and demonstrated strong experience."
+    elif final_score >= 6:
+        feedback = "Good answer with relevant information. " + " ".join(suggestions[:1]) if suggestions else "Consider adding more specific examples."
+    elif final_score >= 4:
+        feedback = "Your answer addresses the question but needs improvement. " + " ".join(suggestions[:2])
+    else:
+        feedback = "This answer needs significant improvement. " + " ".join(suggestions)
+    
+    return {
+        "score": round(final_score, 1),
+        "feedback": feedback,
+        "is_satisfactory": is_satisfactory,
+        "specific_issues": issues,
+        "improvement_suggestions": suggestions
+    }
+
+
+
+def make_answer(rng, role, words):
+    """Build a pseudo-transcript mixing filler with role keywords"""
+    vocabulary = FILLER + tuple(ROLE_CRITERIA[role]["keywords"]) + tuple(EXAMPLE_INDICATORS)
+    return " ".join(rng.choice(vocabulary) for _ in range(words)).capitalize()
+
+
+def main():
+    rng = random.Random(1234)
+    roles = list(ROLE_CRITERIA) + ["unknown_role"]
+
+    # Equivalence check over a spread of lengths and roles
+    for _ in range(2000):
+        role = rng.choice(roles)
+        answer = make_answer(rng, role if role in ROLE_CRITERIA else "software_engineer", rng.randint(0, 60))
+        if evaluate_answer("q", answer, role) != reference_evaluate_answer("q", answer, role):
+            raise SystemExit(f"Mismatch for role={role!r} answer={answer!r}")
+    print("equivalence: 2000 random answers identical")
+
+    print(f"{'words':>6} {'original (us)':>14} {'compiled (us)':>14} {'speedup':>8}")
+    for words in (10, 200, 2000):
+        answers = [(role, make_answer(rng, role, words)) for role in ROLE_CRITERIA]
+        number = max(20, 20000 // words)
+
+        def run(fn):
+            for role, answer in answers:
+                fn("q", answer, role)
+
+        old = min(timeit.repeat(lambda: run(reference_evaluate_answer), number=number, repeat=5))
+        new = min(timeit.repeat(lambda: run(evaluate_answer), number=number, repeat=5))
+        per_call = number * len(answers) / 1e6
+        print(f"{words:>6} {old / per_call:>14.2f} {new / per_call:>14.2f} {old / new:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Memory per live session: compact InterviewSession vs the old dict layout.
+
+Builds ``--sessions`` interviews in a realistic spread of states (from just
+started to completed, with some skipped questions) in both layouts and
+measures the Python heap they occupy with tracemalloc. Answer text is
+unique per session, as it would be in production, so it is counted in
+both. Run from the repository root:
+
+    python benchmarks/bench_session_memory.py --sessions 100000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interview import (  # noqa: E402
+    QUESTION_BANK, QUESTIONS_PER_INTERVIEW, SKIPPED_ANSWER, SKIPPED_FEEDBACK, InterviewSession,
+)
+from scoring import evaluate_answer  # noqa: E402
+
+ANSWER = (
+    "In my last project I developed a software framework for our team, wrote most of the code, "
+    "set up git version control, designed the database schema and the public api"
+)
+
+
+def plan(count, seed):
+    """(role, question indices, [(answer id, score, feedback) or None for a skip]) per session"""
+    rng = random.Random(seed)
+    roles = sorted(QUESTION_BANK.roles())
+    evaluations = {role: evaluate_answer("", ANSWER, role) for role in roles}
+    sessions = []
+    for index in range(count):
+        role = rng.choice(roles)
+        pool = QUESTION_BANK.pool(role)
+        question_ids = pool.sample_indices(QUESTIONS_PER_INTERVIEW)
+        answered = rng.randint(0, len(question_ids))
+        results = []
+        for number in range(answered):
+            if rng.random() < 0.2:
+                results.append(None)
+            else:
+                evaluation = evaluations[role]
+                results.append((f"{index}-{number}", evaluation["score"], evaluation["feedback"]))
+        sessions.append((role, question_ids, results))
+    return sessions
+
+
+def result(planned_result):
+    """(answer, score, feedback), creating the answer text so it is measured"""
+    if planned_result is None:
+        return SKIPPED_ANSWER, 0, SKIPPED_FEEDBACK
+    answer_id, score, feedback = planned_result
+    return f"{ANSWER} ({answer_id})", score, feedback
+
+
+def build_dicts(planned):
+    """The session layout from before InterviewSession"""
+    sessions = []
+    for role, question_ids, results in planned:
+        questions = QUESTION_BANK.pool(role).questions
+        session = {
+            "role": role,
+            "questions": [questions[i] for i in question_ids],
+            "current_question": 0,
+            "answers": [],
+            "scores": [],
+            "started_at": datetime.now().isoformat(),
+            "completed": False,
+        }
+        for planned_result in results:
+            answer, score, feedback = result(planned_result)
+            session["answers"].append({
+                "question": session["questions"][session["current_question"]],
+                "answer": answer,
+                "score": score,
+                "feedback": feedback,
+            })
+            session["scores"].append(score)
+            session["current_question"] += 1
+        if session["current_question"] >= len(session["questions"]):
+            session["completed"] = True
+            session["completed_at"] = datetime.now().isoformat()
+        sessions.append(session)
+    return sessions
+
+
+def build_records(planned):
+    sessions = []
+    for role, question_ids, results in planned:
+        session = InterviewSession(role, QUESTION_BANK.pool(role).questions, question_ids, time.time())
+        for planned_result in results:
+            session.record_answer(*result(planned_result))
+        sessions.append(session)
+    return sessions
+
+
+def measure(build, planned):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = build(planned)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    planned = plan(args.sessions, args.seed)
+    print(f"{'layout':>16} {'total MB':>10} {'bytes/session':>14}")
+    results = {}
+    for name, build in (("dict", build_dicts), ("InterviewSession", build_records)):
+        results[name] = measure(build, planned)
+        print(f"{name:>16} {results[name] / 2**20:>10.1f} {results[name] / args.sessions:>14.0f}")
+    saved = results["dict"] - results["InterviewSession"]
+    print(f"saved {saved / args.sessions:.0f} bytes/session ({saved / results['dict']:.0%})")
+
+
+if __name__ == '__main__':
+    main()
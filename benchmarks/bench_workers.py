@@ -0,0 +1,117 @@
+"""Throughput of the full interview flow as gunicorn workers are added.
+
+Starts ``gunicorn main:app`` with the shared SQLite session backend for each
+worker count, drives start -> submit x5 -> summary interviews from client
+threads (one HTTP connection object each) and prints requests/sec. Run from
+the repository root:
+
+    python benchmarks/bench_workers.py --max-workers 4 --interviews 400
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GOOD_ANSWER = (
+    "In my last project I developed a software framework for our team, wrote most of the code, "
+    "set up git version control, designed the database schema and the public api, and fixed a "
+    "hard bug while debugging the algorithm that handled technical scheduling."
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def post(conn, path, payload):
+    conn.request("POST", path, body=json.dumps(payload), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    body = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{path} returned {response.status}: {body[:200]!r}")
+    return json.loads(body)
+
+
+def run_interview(conn):
+    """One full interview; returns the number of requests made"""
+    started = post(conn, "/api/start-interview", {"role": "software_engineer"})
+    session_id = started["session_id"]
+    requests_made = 1
+    for _ in range(started["total_questions"]):
+        post(conn, "/api/submit-answer", {"session_id": session_id, "answer": GOOD_ANSWER})
+        requests_made += 1
+    post(conn, "/api/get-summary", {"session_id": session_id})
+    return requests_made + 1
+
+
+def drive(port, interviews, clients):
+    counts = [0] * clients
+
+    def client(index):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        for _ in range(index, interviews, clients):
+            counts[index] += run_interview(conn)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--interviews", type=int, default=400)
+    parser.add_argument("--clients", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'req/s':>10} {'scaling':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            env = dict(os.environ, SESSION_BACKEND="sqlite", SESSION_DB_PATH=os.path.join(tmp, "sessions.db"),
+                       RATE_LIMITS="off", EVALUATION_CONCURRENCY="0", LOG_LEVEL="WARNING")
+            server = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+                 "--log-level", "warning", "main:app"],
+                cwd=ROOT, env=env,
+            )
+            try:
+                wait_for_port(port)
+                drive(port, min(20, args.interviews), 4)  # warm up every worker
+                rps = drive(port, args.interviews, args.clients)
+            finally:
+                server.terminate()
+                server.wait()
+        baseline = baseline or rps
+        print(f"{workers:>7} {rps:>10.0f} {rps / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Local stand-in for a model evaluation server.
+
+Speaks the batch protocol RemoteEvaluator expects and scores answers with
+the keyword heuristic, after an injected delay. Run standalone:
+
+    python benchmarks/fake_model_server.py --port 8001 --delay 0.2 --jitter 0.1
+
+then point the app at it with ``EVALUATOR_URL=http://127.0.0.1:8001/evaluate``,
+or start one in-process with ``start_fake_server()``.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import evaluate_answer  # noqa: E402
+
+
+class FakeModelServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay=0.0, jitter=0.0, error_rate=0.0, mangle=None):
+        super().__init__(address, FakeModelHandler)
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        # Applied to every result before it is sent, to fake a misbehaving model
+        self.mangle = mangle
+        self.requests = 0
+        self.items = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/evaluate"
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests += 1
+        server.items += len(body["items"])
+        time.sleep(max(0.0, server.delay + random.uniform(-server.jitter, server.jitter)))
+        if random.random() < server.error_rate:
+            self.send_error(503, "injected failure")
+            return
+        results = [evaluate_answer(item["question"], item["answer"], item["role"]) for item in body["items"]]
+        if server.mangle is not None:
+            results = [server.mangle(result) for result in results]
+        payload = json.dumps({"results": results}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client's latency budget ran out first
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_server(delay=0.0, jitter=0.0, error_rate=0.0, port=0, mangle=None):
+    """Start a FakeModelServer on a background thread and return it"""
+    server = FakeModelServer(("127.0.0.1", port), delay, jitter, error_rate, mangle)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- random seconds on top of --delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+    server = FakeModelServer(("127.0.0.1", args.port), args.delay, args.jitter, args.error_rate)
+    print(f"fake model server on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from scoring import CRITERIA_FINGERPRINT, evaluate_answer
+from session_store import SQLiteConnections
+
+# Keys every evaluation result must carry
+RESULT_KEYS = ("score", "feedback", "is_satisfactory", "specific_issues", "improvement_suggestions")
+
+
+def result_problem(result):
+    """Why a remote evaluation result is unusable, or None if it is well formed"""
+    if not isinstance(result, dict):
+        return "result is not an object"
+    missing = [key for key in RESULT_KEYS if key not in result]
+    if missing:
+        return f"result missing {', '.join(missing)}"
+    score = result["score"]
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 10:
+        return f"score must be a number from 0 to 10, got {score!r}"
+    if not isinstance(result["is_satisfactory"], bool):
+        return f"is_satisfactory must be a boolean, got {result['is_satisfactory']!r}"
+    if not isinstance(result["feedback"], str):
+        return "feedback must be a string"
+    for key in ("specific_issues", "improvement_suggestions"):
+        if not isinstance(result[key], list) or not all(isinstance(item, str) for item in result[key]):
+            return f"{key} must be a list of strings"
+    return None
+
+
+class FallbackResult(dict):
+    """An evaluation produced by a fallback after the primary evaluator failed.
+
+    Behaves like a normal result; CachedEvaluator just never stores it, so a
+    retry gets another chance at the primary evaluator.
+    """
+
+
+class HeuristicEvaluator:
+    """The built-in keyword heuristic from scoring.py"""
+
+    def evaluate(self, question, answer, role):
+        return evaluate_answer(question, answer, role)
+
+    async def evaluate_async(self, question, answer, role):
+        # Fast enough to run inline on the event loop
+        return evaluate_answer(question, answer, role)
+
+
+class RemoteEvaluator:
+    """Evaluator backed by a remote model server, with a heuristic fallback.
+
+    Answers are queued and sent in batches of up to ``batch_size`` (waiting
+    at most ``batch_wait`` seconds to fill one) as::
+
+        POST <url> {"items": [{"question": ..., "answer": ..., "role": ...}]}
+        -> {"results": [<evaluation>, ...]}
+
+    with at most ``concurrency`` batches in flight. Every call has a latency
+    budget of ``budget`` seconds; when it runs out, or the server fails or
+    returns something malformed, the fallback evaluator answers instead.
+
+    All network I/O runs on a private event loop thread, so sync callers
+    (Flask threads) and async callers (the ASGI app) share the same batches
+    and concurrency limit.
+    """
+
+    def __init__(self, url, fallback=None, budget=2.0, concurrency=8, batch_size=8, batch_wait=0.01):
+        self.url = url
+        self.fallback = fallback or HeuristicEvaluator()
+        self.budget = budget
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"remote": 0, "fallback_timeout": 0, "fallback_error": 0, "batches": 0}
+
+    @classmethod
+    def from_env(cls):
+        """Build an evaluator configured from EVALUATOR_* environment variables"""
+        return cls(
+            os.environ["EVALUATOR_URL"],
+            budget=float(os.environ.get("EVALUATOR_BUDGET", 2.0)),
+            concurrency=int(os.environ.get("EVALUATOR_CONCURRENCY", 8)),
+            batch_size=int(os.environ.get("EVALUATOR_BATCH_SIZE", 8)),
+            batch_wait=float(os.environ.get("EVALUATOR_BATCH_WAIT", 0.01)),
+        )
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _ensure_loop(self):
+        # The loop thread does not survive a fork, so start one per process
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                threading.Thread(target=self._run_loop, args=(loop, ready), name="remote-evaluator", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+                self._pid = os.getpid()
+            return self._loop
+
+    def _run_loop(self, loop, ready):
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        loop.create_task(self._batcher())
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def evaluate(self, question, answer, role):
+        if not answer.strip():
+            return self.fallback.evaluate(question, answer, role)
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._evaluate(question, answer, role), loop).result()
+
+    async def evaluate_async(self, question, answer, role):
+        if not answer.strip():
+            return self.fallback.evaluate(question, answer, role)
+        loop = self._ensure_loop()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._evaluate(question, answer, role), loop))
+
+    async def _evaluate(self, question, answer, role):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(({"question": question, "answer": answer, "role": role}, future))
+        try:
+            result = await asyncio.wait_for(future, self.budget)
+            self._count("remote")
+            return result
+        except asyncio.TimeoutError:
+            self._count("fallback_timeout")
+        except Exception as e:
+            logging.warning(f"Remote evaluation failed, using fallback: {str(e)}")
+            self._count("fallback_error")
+        return FallbackResult(self.fallback.evaluate(question, answer, role))
+
+    async def _batcher(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        async with httpx.AsyncClient(timeout=self.budget) as client:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.batch_wait
+                while len(batch) < self.batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                # Callers whose budget already ran out have cancelled their futures
+                batch = [item for item in batch if not item[1].done()]
+                if batch:
+                    await self._semaphore.acquire()
+                    loop.create_task(self._send(client, batch))
+
+    async def _send(self, client, batch):
+        try:
+            response = await client.post(self.url, json={"items": [item for item, _ in batch]})
+            response.raise_for_status()
+            results = response.json()["results"]
+            if len(results) != len(batch):
+                raise ValueError(f"expected {len(batch)} results, got {len(results)}")
+            self._count("batches")
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                problem = result_problem(result)
+                if problem:
+                    future.set_exception(ValueError(problem))
+                else:
+                    future.set_result({key: result[key] for key in RESULT_KEYS})
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._semaphore.release()
+
+
+def normalize_text(text):
+    """Strip outer whitespace and lowercase, so resubmissions differing only in those share a key.
+
+    The heuristic lowercases an answer before matching phrases and splits it
+    on whitespace to count words, so this can never change its score.
+    Whitespace inside the text is left alone: multi-word phrases such as
+    "worked on" only match with a single space between the words.
+    """
+    return text.strip().lower()
+
+
+class EvaluationCache:
+    """Bounded LRU cache of evaluation results.
+
+    Keys are a hash of the scoring-criteria fingerprint, an evaluator
+    namespace and the normalized (role, question, answer), so any change to
+    the criteria in scoring.py invalidates old entries automatically;
+    ``invalidate()`` drops everything explicitly. When ``shared_path`` is
+    given, results are also written as JSON to a SQLite file that other
+    workers consult on a local miss.
+    """
+
+    def __init__(self, max_entries=10000, shared_path=None, namespace=""):
+        self.max_entries = max_entries
+        self.shared_path = shared_path
+        self.namespace = namespace
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connections = SQLiteConnections(shared_path) if shared_path else None
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0}
+        if shared_path:
+            self._shared().execute(
+                "CREATE TABLE IF NOT EXISTS evaluation_cache ("
+                " key BLOB PRIMARY KEY,"
+                " last_used REAL NOT NULL,"
+                " data BLOB NOT NULL)"
+            )
+
+    @classmethod
+    def from_env(cls, namespace=""):
+        """Build a cache configured from EVALUATION_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.environ.get("EVALUATION_CACHE_SIZE", 10000)),
+            shared_path=os.environ.get("EVALUATION_CACHE_DB") or None,
+            namespace=namespace,
+        )
+
+    def _shared(self):
+        return self._connections.get()
+
+    def key(self, question, answer, role):
+        material = "\0".join((CRITERIA_FINGERPRINT, self.namespace, role, normalize_text(question), normalize_text(answer)))
+        return hashlib.blake2b(material.encode(), digest_size=16).digest()
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return dict(result)
+        if self.shared_path:
+            row = self._shared().execute("SELECT data FROM evaluation_cache WHERE key = ?", (key,)).fetchone()
+            result = None
+            if row is not None:
+                try:
+                    result = json.loads(row[0])
+                except ValueError:
+                    # Written by an older version; the next put replaces it
+                    result = None
+            if isinstance(result, dict):
+                self._remember(key, result)
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+                return dict(result)
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key, result):
+        result = dict(result)
+        self._remember(key, result)
+        if self.shared_path:
+            conn = self._shared()
+            conn.execute(
+                "INSERT OR REPLACE INTO evaluation_cache (key, last_used, data) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(result, separators=(",", ":"))),
+            )
+            # Trim the shared table now and then rather than on every insert
+            if key[0] == 0:
+                conn.execute(
+                    "DELETE FROM evaluation_cache WHERE key NOT IN"
+                    " (SELECT key FROM evaluation_cache ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def invalidate(self):
+        """Drop every cached result, locally and in the shared table"""
+        with self._lock:
+            self._entries.clear()
+        if self.shared_path:
+            self._shared().execute("DELETE FROM evaluation_cache")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+class CachedEvaluator:
+    """Memoizes another evaluator through an EvaluationCache.
+
+    The evaluator is always given the answer as submitted. Variants sharing
+    a cache key (see normalize_text) get the same heuristic score, so the
+    cache never changes what the app returns.
+    """
+
+    def __init__(self, evaluator, cache):
+        self.evaluator = evaluator
+        self.cache = cache
+
+    def evaluate(self, question, answer, role):
+        key = self.cache.key(question, answer, role)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.evaluator.evaluate(question, answer, role)
+            if not isinstance(result, FallbackResult):
+                self.cache.put(key, result)
+        return result
+
+    async def evaluate_async(self, question, answer, role):
+        key = self.cache.key(question, answer, role)
+        # A shared cache reads and writes SQLite, which must not block the event loop
+        shared = self.cache.shared_path is not None
+        result = await asyncio.to_thread(self.cache.get, key) if shared else self.cache.get(key)
+        if result is None:
+            result = await self.evaluator.evaluate_async(question, answer, role)
+            if not isinstance(result, FallbackResult):
+                if shared:
+                    await asyncio.to_thread(self.cache.put, key, result)
+                else:
+                    self.cache.put(key, result)
+        return result
+
+
+def create_evaluator():
+    """Use the remote evaluator when EVALUATOR_URL is set, else the heuristic.
+
+    Results are memoized unless EVALUATION_CACHE_SIZE is 0.
+    """
+    if os.environ.get("EVALUATOR_URL"):
+        evaluator = RemoteEvaluator.from_env()
+        namespace = evaluator.url
+    else:
+        evaluator = HeuristicEvaluator()
+        namespace = "heuristic"
+    cache = EvaluationCache.from_env(namespace)
+    if cache.max_entries <= 0:
+        return evaluator
+    return CachedEvaluator(evaluator, cache)
@@ -0,0 +1,366 @@
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from evaluators import HeuristicEvaluator
+from question_bank import QuestionBank, QuestionScheduler
+from session_store import SessionConflict
+from structured_logging import bind
+
+# Question pools for each job role, loaded from data/questions/<role>.json
+QUESTION_BANK = QuestionBank.from_env()
+
+# Remembers which questions each returning candidate has already been dealt
+QUESTION_SCHEDULER = QuestionScheduler.from_env(QUESTION_BANK)
+
+# Number of questions to select for each interview
+QUESTIONS_PER_INTERVIEW = 5
+
+def deal_questions(role, tags=(), candidate_id=None):
+    """Pick the questions for one interview.
+
+    Returns the role's question pool and the indices of the chosen
+    questions in it. With tags, only questions carrying every one of them
+    (e.g. "senior", "databases") are considered; if fewer match than an
+    interview needs, all of the matches are returned. With a candidate_id,
+    questions that candidate was dealt in earlier interviews are avoided
+    until they have seen the whole pool.
+    """
+    if role not in QUESTION_BANK:
+        role = "software_engineer"  # Default fallback
+
+    pool = QUESTION_BANK.pool(role)
+    if candidate_id is not None:
+        indices = QUESTION_SCHEDULER.deal_indices(candidate_id, role, pool, QUESTIONS_PER_INTERVIEW, tags)
+    else:
+        indices = pool.sample_indices(QUESTIONS_PER_INTERVIEW, tags)
+    return pool.questions, indices
+
+
+# Recorded for a skipped question in place of an answer and its feedback
+SKIPPED_ANSWER = "[Skipped]"
+SKIPPED_FEEDBACK = "Question was skipped by the user."
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+class InterviewSession:
+    """Compact state of one interview.
+
+    ``pool`` is the role's question tuple from the question bank, shared by
+    every session dealt from it, and ``question_ids`` index into it, so a
+    session holds no question text of its own (and keeps the tuple it was
+    dealt from across a question bank reload). Answers are (answer, score,
+    feedback) tuples in question order, timestamps are epoch seconds, and
+    the score sum and count are kept up to date as answers come in.
+
+    When saved (as JSON by the SQLite store, pickled by the journal), only
+    the text of the dealt questions is written, and ``rev``
+    (SQLiteSessionStore's revision) is left out.
+    """
+
+    __slots__ = ("role", "pool", "question_ids", "current_question", "answers", "score_sum",
+                 "score_count", "started_at", "completed_at", "completed", "rev")
+
+    def __init__(self, role, pool, question_ids, started_at):
+        self.role = role
+        self.pool = pool
+        self.question_ids = tuple(question_ids)
+        self.current_question = 0
+        self.answers = []
+        self.score_sum = 0
+        self.score_count = 0
+        self.started_at = started_at
+        self.completed_at = None
+        self.completed = False
+        self.rev = None
+
+    @property
+    def total_questions(self):
+        return len(self.question_ids)
+
+    def question(self, number):
+        """Text of the question at position number in this interview"""
+        return self.pool[self.question_ids[number]]
+
+    def record_answer(self, answer, score, feedback):
+        """Record the result for the current question and move to the next"""
+        self.answers.append((answer, score, feedback))
+        self.score_sum += score
+        self.score_count += 1
+        self.current_question += 1
+        if self.current_question >= len(self.question_ids):
+            self.completed = True
+            self.completed_at = time.time()
+
+    def average_score(self):
+        return self.score_sum / self.score_count
+
+    def detailed_results(self):
+        return [
+            {"question": self.question(number), "answer": answer, "score": score, "feedback": feedback}
+            for number, (answer, score, feedback) in enumerate(self.answers)
+        ]
+
+    def __getstate__(self):
+        questions = tuple(self.question(number) for number in range(len(self.question_ids)))
+        return (self.role, questions, self.current_question, self.answers, self.score_sum,
+                self.score_count, self.started_at, self.completed_at, self.completed)
+
+    def __setstate__(self, state):
+        (self.role, pool, self.current_question, answers, self.score_sum,
+         self.score_count, self.started_at, self.completed_at, self.completed) = state
+        # JSON turns the tuples into lists
+        self.pool = tuple(pool)
+        self.answers = [tuple(answer) for answer in answers]
+        self.question_ids = tuple(range(len(self.pool)))
+        self.rev = None
+
+
+class InterviewError(Exception):
+    """A client-facing error with the HTTP status it should be reported as"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+# An answer awaiting evaluation; index is the question number it answers
+PendingAnswer = namedtuple("PendingAnswer", ["session_id", "session", "index", "question", "answer"])
+
+
+class InterviewService:
+    """The interview state machine shared by the Flask and ASGI front ends.
+
+    Each method takes the decoded JSON request body and returns the JSON
+    response payload, raising InterviewError for client errors. Answer
+    submission is split into ``begin_answer`` and ``finish_answer`` so an
+    async front end can await the evaluation in between without blocking;
+    ``submit_answer`` runs all three steps synchronously.
+    """
+
+    def __init__(self, sessions, evaluator=None, journal=None, audio=None, analytics=None):
+        self.sessions = sessions
+        self.evaluator = evaluator or HeuristicEvaluator()
+        self.journal = journal
+        self.audio = audio
+        self.analytics = analytics
+
+    def _audio_urls(self, session, number):
+        """audio_url for question number, plus next_audio_url for the client to prefetch"""
+        if self.audio is None:
+            return {}
+        following = number + 1
+        return {
+            "audio_url": self.audio.url(session.question(number)),
+            "next_audio_url": self.audio.url(session.question(following)) if following < session.total_questions else None,
+        }
+
+    def _get_session(self, data):
+        session_id = data.get('session_id')
+        session = self.sessions.get(session_id) if session_id else None
+        if session is None:
+            raise InterviewError("Invalid session")
+        bind(session_id=session_id, role=session.role)
+        return session_id, session
+
+    def _save(self, session_id, session, op):
+        try:
+            self.sessions.put(session_id, session)
+        except SessionConflict:
+            raise InterviewError("Session was modified concurrently, please retry", 409)
+        if self.journal is not None:
+            self.journal.record("complete" if session.completed else op, session_id, session)
+
+    def start_interview(self, data):
+        """Start a new interview session"""
+        role = data.get('role')
+        tags = data.get('tags') or []
+        candidate_id = data.get('candidate_id') or None
+
+        if not role or role not in QUESTION_BANK:
+            raise InterviewError("Invalid role selected")
+
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise InterviewError("Invalid tags")
+
+        if candidate_id is not None and (not isinstance(candidate_id, str) or len(candidate_id) > 128):
+            raise InterviewError("Invalid candidate id")
+
+        pool, question_ids = deal_questions(role, tags, candidate_id)
+        if not question_ids:
+            raise InterviewError("No questions match the selected tags")
+
+        session_id = str(uuid.uuid4())
+        session = InterviewSession(role, pool, question_ids, time.time())
+        bind(session_id=session_id, role=role)
+
+        self._save(session_id, session, "start")
+        if self.analytics is not None:
+            self.analytics.started(role)
+
+        return {
+            "session_id": session_id,
+            "role": role,
+            "first_question": session.question(0),
+            "total_questions": session.total_questions,
+            **self._audio_urls(session, 0)
+        }
+
+    def begin_answer(self, data):
+        """Validate a submitted answer and return it as a PendingAnswer"""
+        answer = data.get('answer', '').strip()
+        session_id, session = self._get_session(data)
+
+        if session.completed:
+            raise InterviewError("Interview already completed")
+
+        index = session.current_question
+        return PendingAnswer(session_id, session, index, session.question(index), answer)
+
+    def finish_answer(self, pending, evaluation):
+        """Apply an evaluation to its session and build the response"""
+        session_id, session, index, current_question, answer = pending
+
+        # Another request for this session may have moved it on while the answer was evaluated
+        if session.completed or session.current_question != index:
+            raise InterviewError("This question was already answered, please refresh", 409)
+
+        response = {
+            "question_completed": False,
+            "feedback": evaluation["feedback"],
+            "score": evaluation["score"],
+            "is_satisfactory": evaluation["is_satisfactory"],
+            "specific_issues": evaluation["specific_issues"],
+            "improvement_suggestions": evaluation["improvement_suggestions"]
+        }
+
+        # If answer is satisfactory, proceed to next question
+        if evaluation["is_satisfactory"]:
+            # Store answer and score, and move to next question
+            session.record_answer(answer, evaluation["score"], evaluation["feedback"])
+            response["question_completed"] = True
+
+            # Check if interview is complete
+            if session.completed:
+                response.update({
+                    "interview_complete": True,
+                    "final_score": round(session.average_score(), 1),
+                    "total_questions": session.total_questions
+                })
+            else:
+                # Get next question
+                response.update({
+                    "interview_complete": False,
+                    "next_question": session.question(session.current_question),
+                    "question_number": session.current_question + 1,
+                    "total_questions": session.total_questions,
+                    **self._audio_urls(session, session.current_question)
+                })
+
+            self._save(session_id, session, "answer")
+            if self.analytics is not None:
+                self.analytics.answered(session.role, current_question, evaluation["score"], True)
+                if session.completed:
+                    self.analytics.completed(session.role, round(session.average_score(), 1))
+        else:
+            if self.analytics is not None:
+                self.analytics.answered(session.role, current_question, evaluation["score"], False)
+
+            # Answer is not satisfactory, ask same question again
+            response.update({
+                "interview_complete": False,
+                "repeat_question": True,
+                "current_question": current_question,
+                "question_number": session.current_question + 1,
+                "total_questions": session.total_questions,
+                "retry_message": "Let me ask the same question again. Please provide a more detailed answer.",
+                **self._audio_urls(session, session.current_question)
+            })
+
+        return response
+
+    def submit_answer(self, data):
+        """Submit an answer and get the next question"""
+        pending = self.begin_answer(data)
+        evaluation = self.evaluator.evaluate(pending.question, pending.answer, pending.session.role)
+        return self.finish_answer(pending, evaluation)
+
+    def skip_question(self, data):
+        """Skip the current question and go to the next one"""
+        session_id, session = self._get_session(data)
+
+        if session.completed:
+            raise InterviewError("Interview already completed")
+
+        # Log the skipped question with empty answer and 0 score, and move on
+        skipped = session.question(session.current_question)
+        session.record_answer(SKIPPED_ANSWER, 0, SKIPPED_FEEDBACK)
+        self._save(session_id, session, "skip")
+        if self.analytics is not None:
+            self.analytics.skipped(session.role, skipped)
+            if session.completed:
+                self.analytics.completed(session.role, round(session.average_score(), 1))
+
+        # Check if interview is now complete
+        if session.completed:
+            return {
+                "interview_complete": True,
+                "final_score": round(session.average_score(), 1),
+                "total_questions": session.total_questions
+            }
+
+        # Else, send next question
+        return {
+            "interview_complete": False,
+            "next_question": session.question(session.current_question),
+            "question_number": session.current_question + 1,
+            "total_questions": session.total_questions,
+            **self._audio_urls(session, session.current_question)
+        }
+
+    def cancel_interview(self, data):
+        """Cancel an ongoing interview session"""
+        session_id = data.get('session_id')
+
+        # Remove from active sessions
+        session = self.sessions.pop(session_id) if session_id else None
+        if session is None:
+            raise InterviewError("Invalid session")
+
+        if self.journal is not None:
+            self.journal.record("cancel", session_id, None)
+
+        return {"message": "Interview cancelled successfully"}
+
+    def get_summary(self, data):
+        """Get interview summary and detailed feedback"""
+        session_id, session = self._get_session(data)
+
+        if not session.completed:
+            raise InterviewError("Interview not completed")
+
+        avg_score = session.average_score()
+
+        # Generate overall feedback
+        if avg_score >= 8:
+            overall_feedback = "Outstanding performance! You demonstrated excellent knowledge and communication skills throughout the interview."
+        elif avg_score >= 6:
+            overall_feedback = "Good performance overall. You showed relevant experience and knowledge with room for improvement in some areas."
+        elif avg_score >= 4:
+            overall_feedback = "Adequate performance. Focus on providing more detailed examples and demonstrating deeper knowledge in future interviews."
+        else:
+            overall_feedback = "There's significant room for improvement. Consider practicing more specific examples and developing stronger responses."
+
+        return {
+            "role": session.role,
+            "final_score": round(avg_score, 1),
+            "total_questions": session.total_questions,
+            "overall_feedback": overall_feedback,
+            "detailed_results": session.detailed_results(),
+            "duration": _isoformat(session.completed_at) if session.completed_at is not None else "",
+            "started_at": _isoformat(session.started_at)
+        }
@@ -0,0 +1,255 @@
+import fcntl
+import glob
+import logging
+import os
+import pickle
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from session_store import SessionStore
+
+# Each record is framed as <payload length><crc32 of payload><payload>
+_HEADER = struct.Struct("<II")
+
+# Operations that remove a session; everything else upserts its state
+DELETE_OPS = frozenset(["cancel", "evict"])
+
+
+class _Pending:
+    __slots__ = ("frame", "done")
+
+    def __init__(self, frame, wait):
+        self.frame = frame
+        self.done = threading.Event() if wait else None
+
+
+class SessionJournal:
+    """Crash-safe append-only journal of session mutations.
+
+    Every mutation (start, answer, skip, complete, cancel, and the store
+    evicting or expiring a session) is appended as a
+    framed, checksummed record carrying the session's full state after the
+    change, so replaying a record twice is harmless. A single writer thread
+    drains whatever records are queued, writes them in one go and fsyncs
+    once per batch (group commit). In ``sync_mode="group"`` callers wait for
+    the fsync that covers their record; in ``"async"`` they return as soon
+    as the record is queued.
+
+    After ``snapshot_every`` records the writer starts a new log segment,
+    writes a snapshot of all live sessions and deletes older segments, so
+    replay on startup only reads the latest snapshot plus one or two short
+    segments. A torn record at the end of a segment (crash mid-write) is
+    detected by its checksum and dropped.
+    """
+
+    def __init__(self, directory, sync_mode="group", snapshot_every=10000, snapshot_source=None):
+        if sync_mode not in ("group", "async"):
+            raise ValueError(f"Unknown journal sync mode: {sync_mode}")
+        self.directory = directory
+        self.sync_mode = sync_mode
+        self.snapshot_every = snapshot_every
+        self.snapshot_source = snapshot_source
+        os.makedirs(directory, exist_ok=True)
+        # Only one process may own a journal directory
+        self._lock_file = open(os.path.join(directory, "journal.lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            raise RuntimeError(f"Journal directory {directory} is in use by another process: "
+                               f"the journal requires SESSION_BACKEND=memory and a single worker")
+        self._queue = queue.Queue()
+        self._segment = None
+        self._file = None
+        self._since_snapshot = 0
+        self._thread = None
+
+    def _path(self, kind, seq):
+        return os.path.join(self.directory, f"{kind}-{seq:012d}.{'log' if kind == 'journal' else 'pkl'}")
+
+    @staticmethod
+    def _seq(path):
+        return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+    def _sequences(self, kind):
+        return sorted(self._seq(path) for path in glob.glob(os.path.join(self.directory, f"{kind}-*")))
+
+    def replay(self):
+        """Rebuild {session_id: (session, last_modified)} from snapshot and logs"""
+        sessions = {}
+        snapshots = self._sequences("snapshot")
+        start = 0
+        if snapshots:
+            start = snapshots[-1]
+            with open(self._path("snapshot", start), "rb") as f:
+                sessions = pickle.load(f)
+        for seq in self._sequences("journal"):
+            if seq < start:
+                continue
+            path = self._path("journal", seq)
+            valid = 0
+            with open(path, "rb") as f:
+                data = f.read()
+            while valid + _HEADER.size <= len(data):
+                length, crc = _HEADER.unpack_from(data, valid)
+                payload = data[valid + _HEADER.size:valid + _HEADER.size + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                ts, op, session_id, session = pickle.loads(payload)
+                if op in DELETE_OPS:
+                    sessions.pop(session_id, None)
+                else:
+                    sessions[session_id] = (session, ts)
+                valid += _HEADER.size + length
+            if valid < len(data):
+                logging.warning(f"Dropping {len(data) - valid} torn bytes at the end of {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+        return sessions
+
+    def start(self):
+        """Open a fresh segment and start the writer thread"""
+        sequences = self._sequences("journal") + self._sequences("snapshot")
+        self._open_segment(max(sequences, default=0) + 1)
+        self._thread = threading.Thread(target=self._write_loop, name="session-journal", daemon=True)
+        self._thread.start()
+
+    def _open_segment(self, seq):
+        if self._file is not None:
+            self._file.close()
+        self._segment = seq
+        self._file = open(self._path("journal", seq), "ab")
+        self._fsync_directory()
+
+    def _fsync_directory(self):
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def record(self, op, session_id, session, wait=True):
+        """Append one mutation; in group mode, returns once it is on disk unless wait is False"""
+        payload = pickle.dumps((time.time(), op, session_id, session), protocol=pickle.HIGHEST_PROTOCOL)
+        pending = _Pending(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload,
+                           wait and self.sync_mode == "group")
+        self._queue.put(pending)
+        if pending.done is not None:
+            pending.done.wait()
+
+    def forget(self, session_id):
+        """Record that the store evicted or expired a session, so replay does not bring it back.
+
+        Called on whatever request triggered the eviction, so it does not
+        wait for the fsync; a crash just before it lands can only bring
+        back a session the store had dropped anyway.
+        """
+        self.record("evict", session_id, None, wait=False)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [pending for pending in batch if pending is not None]
+            if batch:
+                try:
+                    self._file.write(b"".join(pending.frame for pending in batch))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                except Exception as e:
+                    logging.error(f"Journal write failed: {str(e)}")
+                for pending in batch:
+                    if pending.done is not None:
+                        pending.done.set()
+                self._since_snapshot += len(batch)
+                if self.snapshot_source is not None and self._since_snapshot >= self.snapshot_every:
+                    try:
+                        self.compact()
+                    except Exception as e:
+                        logging.error(f"Journal compaction failed: {str(e)}")
+            if stop:
+                return
+
+    def compact(self):
+        """Snapshot all live sessions and drop the segments it supersedes.
+
+        Runs on the writer thread: records queued meanwhile go to the new
+        segment, which replay applies on top of the snapshot.
+        """
+        seq = self._segment + 1
+        self._open_segment(seq)
+        self._since_snapshot = 0
+        now = time.time()
+        sessions = {}
+        for session_id, session, idle in self.snapshot_source():
+            # Retry if a request mutates the session while it is pickled
+            for _ in range(3):
+                try:
+                    # Keep when the session was last used, so restore expires it on time
+                    sessions[session_id] = (pickle.loads(pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL)),
+                                            now - idle)
+                    break
+                except RuntimeError:
+                    continue
+        tmp = self._path("snapshot", seq) + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(sessions, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path("snapshot", seq))
+        self._fsync_directory()
+        for old in self._sequences("journal"):
+            if old < seq:
+                os.remove(self._path("journal", old))
+        for old in self._sequences("snapshot"):
+            if old < seq:
+                os.remove(self._path("snapshot", old))
+
+    def close(self):
+        """Flush outstanding records and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._lock_file.close()
+
+    def restore(self, store, idle_ttl, completed_ttl):
+        """Replay the journal into a session store, skipping expired sessions"""
+        now = time.time()
+        restored = 0
+        for session_id, (session, modified) in self.replay().items():
+            ttl = completed_ttl if session.completed else idle_ttl
+            if now - modified <= ttl:
+                # Restored sessions keep their age, so they expire when they would have
+                store.put(session_id, session, idle=now - modified)
+                restored += 1
+        return restored
+
+    @classmethod
+    def from_env(cls, sessions):
+        """Build a journal for an in-memory session store from JOURNAL_* environment variables.
+
+        Shared stores such as SQLiteSessionStore already persist sessions
+        and are written by several workers, which cannot share one journal.
+        """
+        if not isinstance(sessions, SessionStore):
+            raise ValueError("JOURNAL_DIR is set but the journal requires SESSION_BACKEND=memory and a single worker")
+        journal = cls(
+            os.environ["JOURNAL_DIR"],
+            sync_mode=os.environ.get("JOURNAL_SYNC", "group"),
+            snapshot_every=int(os.environ.get("JOURNAL_SNAPSHOT_EVERY", 10000)),
+            snapshot_source=sessions.items,
+        )
+        # Sessions the store drops must stay dropped after a restart
+        sessions.on_remove = journal.forget
+        return journal
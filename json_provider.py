@@ -0,0 +1,107 @@
+import json
+import os
+from collections import namedtuple
+
+from flask.json.provider import DefaultJSONProvider
+
+# A JSON implementation: dumps(obj, default, sort_keys, indent) -> bytes, loads(str | bytes)
+JSONBackend = namedtuple("JSONBackend", ["name", "dumps", "loads"])
+
+# Tried in this order when JSON_BACKEND is not set
+BACKEND_PREFERENCE = ("orjson", "ujson", "json")
+
+
+def _orjson_backend():
+    import orjson
+
+    base = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(obj, default=None, sort_keys=False, indent=False):
+        option = base | (orjson.OPT_SORT_KEYS if sort_keys else 0) | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+
+    return JSONBackend("orjson", dumps, orjson.loads)
+
+
+def _ujson_backend():
+    import ujson
+
+    def dumps(obj, default=None, sort_keys=False, indent=False):
+        return ujson.dumps(
+            obj, default=default, sort_keys=sort_keys, indent=2 if indent else 0,
+            ensure_ascii=False, escape_forward_slashes=False,
+        ).encode()
+
+    return JSONBackend("ujson", dumps, ujson.loads)
+
+
+def _stdlib_backend():
+    def dumps(obj, default=None, sort_keys=False, indent=False):
+        return json.dumps(
+            obj, default=default, sort_keys=sort_keys, ensure_ascii=False, allow_nan=False,
+            indent=2 if indent else None, separators=None if indent else (",", ":"),
+        ).encode()
+
+    return JSONBackend("json", dumps, json.loads)
+
+
+_BACKENDS = {"orjson": _orjson_backend, "ujson": _ujson_backend, "json": _stdlib_backend}
+
+
+def load_backend(name=None):
+    """The named JSON backend, or the fastest installed one.
+
+    Without a name, JSON_BACKEND is used if set, else the first of
+    BACKEND_PREFERENCE that imports.
+    """
+    name = name or os.environ.get("JSON_BACKEND")
+    if name:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown JSON_BACKEND: {name}")
+        return _BACKENDS[name]()
+    for candidate in BACKEND_PREFERENCE:
+        try:
+            return _BACKENDS[candidate]()
+        except ImportError:
+            continue
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson or ujson when installed.
+
+    Request bodies are decoded and ``jsonify`` responses encoded straight
+    to bytes by the selected backend, keeping Flask's sorted keys and
+    ``default`` conversions. Output differs from the stdlib provider only
+    in whitespace and in writing non-ASCII characters as UTF-8 rather
+    than \\u escapes, which any JSON parser reads identically. Values the
+    backend cannot encode (integers beyond 64 bits, for orjson) fall back
+    to the stdlib encoder, as do calls passing json.dumps keyword
+    arguments.
+    """
+
+    def __init__(self, app, backend=None):
+        super().__init__(app)
+        self.backend = backend or load_backend()
+
+    def _dumps_bytes(self, obj, indent=False):
+        if self.backend.name == "json":
+            return super().dumps(obj, **({"indent": 2} if indent else {"separators": (",", ":")})).encode()
+        try:
+            return self.backend.dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent)
+        except (TypeError, OverflowError):
+            return super().dumps(obj, separators=(",", ":")).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self.backend.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,317 @@
+import bisect
+import collections
+import sys
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond handlers to slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = collections.defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, labels, (), value) for labels, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        """Context manager observing the duration of its body"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        samples = []
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((self.name + "_bucket", labels, (("le", _format_value(bound)),), cumulative))
+            samples.append((self.name + "_sum", labels, (), total))
+            samples.append((self.name + "_count", labels, (), count))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are computed by a callback at scrape time.
+
+    The callback returns an iterable of (label values tuple, value); use it
+    for values some other component already tracks.
+    """
+
+    def __init__(self, name, help, labelnames, callback, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self):
+        return [(self.name, labels, (), value) for labels, value in self.callback()]
+
+
+class Registry:
+    """A set of metrics rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, labelnames, callback, kind="gauge"):
+        return self.register(CallbackMetric(name, help, labelnames, callback, kind))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(metric.labelnames, labels, extra)} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+# Content type Prometheus expects for the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class InterviewMetrics:
+    """The metrics both front ends export at /metrics"""
+
+    def __init__(self, sessions, admission=None, evaluator=None):
+        self.registry = Registry()
+        self.request_duration = self.registry.histogram(
+            "interview_http_request_duration_seconds", "Request latency by endpoint",
+            ("endpoint", "method", "status"),
+        )
+        self.errors = self.registry.counter(
+            "interview_http_errors_total", "Responses with a 4xx or 5xx status", ("endpoint", "status"),
+        )
+        self.evaluation_duration = self.registry.histogram(
+            "interview_evaluation_duration_seconds", "Time spent evaluating one answer", ("evaluator",),
+        )
+        self.registry.callback(
+            "interview_sessions", "Sessions currently in the session store", ("state",),
+            lambda: self._session_counts(sessions),
+        )
+        self.registry.callback(
+            "interview_session_evictions_total", "Sessions dropped from the store by this worker", ("reason",),
+            lambda: [((reason,), value) for reason, value in sessions.stats().items()
+                     if reason in ("evicted_lru", "expired_idle", "expired_completed")],
+            kind="counter",
+        )
+        if admission is not None:
+            self.registry.callback(
+                "interview_requests_shed_total", "Requests rejected by rate limiting or overload", ("endpoint", "reason"),
+                admission.shed_counts, kind="counter",
+            )
+            self.registry.callback(
+                "interview_evaluations_in_flight", "Answers being evaluated right now", (),
+                lambda: [((), admission.in_flight_evaluations())],
+            )
+            self.registry.callback(
+                "interview_rate_limit_buckets", "Client token buckets held by the rate limiter", (),
+                lambda: [((), len(admission.limiter))],
+            )
+
+        cache = getattr(evaluator, "cache", None)
+        if cache is not None:
+            self.registry.callback(
+                "interview_evaluation_cache_lookups_total", "Evaluation cache lookups by result", ("result",),
+                lambda: [((result,), value) for result, value in cache.stats().items()
+                         if result in ("hits", "shared_hits", "misses")],
+                kind="counter",
+            )
+            self.registry.callback(
+                "interview_evaluation_cache_evictions_total", "Results evicted from this worker's evaluation cache", (),
+                lambda: [((), cache.stats()["evictions"])], kind="counter",
+            )
+            self.registry.callback(
+                "interview_evaluation_cache_entries", "Results held in this worker's evaluation cache", (),
+                lambda: [((), cache.stats()["entries"])],
+            )
+        # The evaluator behind a caching wrapper, if it reports its own counts
+        remote = getattr(evaluator, "evaluator", evaluator)
+        if hasattr(remote, "stats"):
+            self.registry.callback(
+                "interview_remote_evaluations_total", "Remote evaluations by outcome", ("outcome",),
+                lambda: [((outcome,), value) for outcome, value in remote.stats().items() if outcome != "batches"],
+                kind="counter",
+            )
+            self.registry.callback(
+                "interview_remote_batches_total", "Batches sent to the remote evaluator", (),
+                lambda: [((), remote.stats()["batches"])], kind="counter",
+            )
+
+    @staticmethod
+    def _session_counts(sessions):
+        stats = sessions.stats()
+        return [(("active",), stats["sessions"] - stats["completed"]), (("completed",), stats["completed"])]
+
+    def observe_request(self, endpoint, method, status, seconds):
+        self.request_duration.observe(seconds, endpoint, method, str(status))
+        if status >= 400:
+            self.errors.inc(endpoint, str(status))
+
+    def render(self):
+        return self.registry.render()
+
+
+class TimedEvaluator:
+    """Wraps an evaluator and records how long each evaluation takes"""
+
+    def __init__(self, evaluator, histogram, name=None):
+        self.evaluator = evaluator
+        self.histogram = histogram
+        # Label by the underlying evaluator rather than a caching wrapper
+        self.name = name or type(getattr(evaluator, "evaluator", evaluator)).__name__
+
+    def evaluate(self, question, answer, role):
+        with self.histogram.time(self.name):
+            return self.evaluator.evaluate(question, answer, role)
+
+    async def evaluate_async(self, question, answer, role):
+        with self.histogram.time(self.name):
+            return await self.evaluator.evaluate_async(question, answer, role)
+
+
+class SamplingProfiler:
+    """Low-overhead statistical profiler that can be switched on at runtime.
+
+    While running, a background thread samples the stack of every other
+    thread every ``interval`` seconds and counts identical stacks. ``stop``
+    returns them in the collapsed "frame;frame;frame count" format that
+    flamegraph tools read.
+    """
+
+    def __init__(self, interval=0.005, max_stacks=10000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._stacks = collections.Counter()
+        self.samples = 0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._stacks = collections.Counter()
+            self.samples = 0
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        return self.collapsed()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                if key in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[key] += 1
+            self.samples += 1
@@ -0,0 +1,153 @@
+"""Pre-rendered question audio.
+
+Every question in the question bank is synthesized offline with pyttsx3
+into ``<digest>.wav``, where the digest hashes the voice settings and the
+question text, so a file's name changes whenever its content would and
+the files can be cached forever. Render (or top up after editing the
+question bank) with::
+
+    python question_audio.py
+    python question_audio.py --voice english --rate 170 --prune
+
+The web apps serve the files from /api/question-audio/<digest>.wav and
+put their URLs in interview responses once they exist.
+"""
+import argparse
+import functools
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+# Digest part of an audio file name
+AUDIO_NAME = re.compile(r"^[0-9a-f]{32}$")
+
+AUDIO_ROUTE = "/api/question-audio/"
+
+# Rendered files never change, so clients may cache them for a year
+AUDIO_MAX_AGE = 365 * 24 * 3600
+
+
+@functools.lru_cache(maxsize=65536)
+def audio_digest(text, voice="", rate=0):
+    """Content address of the audio for text spoken with the given voice settings"""
+    return hashlib.blake2b(f"{voice}\0{rate}\0{text}".encode(), digest_size=16).hexdigest()
+
+
+class QuestionAudio:
+    """Directory of rendered question audio, keyed by audio_digest.
+
+    ``url`` only returns a URL for questions whose file exists, so clients
+    fall back to in-browser speech for anything not rendered yet. The
+    directory listing is re-read when it changes, checked at most every
+    ``reload_interval`` seconds.
+    """
+
+    def __init__(self, directory, voice="", rate=0, reload_interval=2.0, clock=time.monotonic):
+        self.directory = directory
+        self.voice = voice
+        self.rate = rate
+        self.reload_interval = reload_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._available = frozenset()
+        self._mtime = None
+        self._checked = None
+
+    @classmethod
+    def from_env(cls):
+        """Build an audio store configured from QUESTION_AUDIO_* environment variables"""
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "audio")
+        return cls(
+            os.environ.get("QUESTION_AUDIO_DIR", default),
+            voice=os.environ.get("QUESTION_AUDIO_VOICE", ""),
+            rate=int(os.environ.get("QUESTION_AUDIO_RATE", 0)),
+        )
+
+    def digest(self, text):
+        return audio_digest(text, self.voice, self.rate)
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest + ".wav")
+
+    def available(self):
+        """Digests of every rendered file"""
+        now = self._clock()
+        if self._checked is None or now - self._checked >= self.reload_interval:
+            with self._lock:
+                if self._checked is None or now - self._checked >= self.reload_interval:
+                    try:
+                        mtime = os.stat(self.directory).st_mtime_ns
+                    except FileNotFoundError:
+                        mtime = None
+                    if mtime != self._mtime:
+                        names = os.listdir(self.directory) if mtime is not None else ()
+                        self._available = frozenset(name[:-4] for name in names if name.endswith(".wav"))
+                        self._mtime = mtime
+                    self._checked = now
+        return self._available
+
+    def url(self, text):
+        """URL of the rendered audio for a question, or None if there is none"""
+        digest = self.digest(text)
+        if digest in self.available():
+            return f"{AUDIO_ROUTE}{digest}.wav"
+        return None
+
+    def render(self, texts, prune=False, log=logging.info):
+        """Synthesize every text without a file yet; returns how many were rendered.
+
+        Files are written under temporary names and renamed into place once
+        the engine has finished, so a partly written file is never served.
+        With prune, files for texts no longer in ``texts`` are deleted.
+        """
+        import pyttsx3
+
+        os.makedirs(self.directory, exist_ok=True)
+        wanted = {self.digest(text): text for text in texts}
+        missing = {digest: text for digest, text in wanted.items() if not os.path.exists(self.path(digest))}
+        if missing:
+            engine = pyttsx3.init()
+            if self.voice:
+                engine.setProperty("voice", self.voice)
+            if self.rate:
+                engine.setProperty("rate", self.rate)
+            for digest, text in missing.items():
+                engine.save_to_file(text, self.path(digest) + ".tmp")
+            engine.runAndWait()
+            for digest in missing:
+                os.replace(self.path(digest) + ".tmp", self.path(digest))
+            log(f"Rendered {len(missing)} question audio files into {self.directory}")
+        if prune:
+            for name in os.listdir(self.directory):
+                if name.endswith(".wav") and name[:-4] not in wanted:
+                    os.remove(os.path.join(self.directory, name))
+        return len(missing)
+
+
+def main(argv=None):
+    from interview import QUESTION_BANK
+
+    parser = argparse.ArgumentParser(description="Pre-render audio for every question in the question bank")
+    parser.add_argument("--dir", help="output directory (default: QUESTION_AUDIO_DIR or data/audio)")
+    parser.add_argument("--voice", help="pyttsx3 voice id (default: QUESTION_AUDIO_VOICE or the engine default)")
+    parser.add_argument("--rate", type=int, help="words per minute (default: QUESTION_AUDIO_RATE or the engine default)")
+    parser.add_argument("--prune", action="store_true", help="delete audio for questions no longer in the bank")
+    args = parser.parse_args(argv)
+
+    audio = QuestionAudio.from_env()
+    audio.directory = args.dir or audio.directory
+    audio.voice = args.voice if args.voice is not None else audio.voice
+    audio.rate = args.rate if args.rate is not None else audio.rate
+
+    texts = []
+    for role in sorted(QUESTION_BANK.roles()):
+        texts.extend(QUESTION_BANK.pool(role).questions)
+    logging.basicConfig(level=logging.INFO)
+    audio.render(texts, prune=args.prune)
+
+
+if __name__ == '__main__':
+    main()
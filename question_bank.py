@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+# Distinct tag combinations whose matching questions are cached per role
+_COMBINATION_CACHE_SIZE = 256
+
+
+class RolePool:
+    """The questions for one role, indexed by tag.
+
+    ``questions`` keeps file order. ``by_tag`` maps each tag to the indices
+    of the questions carrying it, so sampling under a single tag only
+    touches that index; the intersection for a multi-tag filter is built
+    once and cached.
+    """
+
+    __slots__ = ("questions", "by_tag", "mtime", "_combinations", "_lock")
+
+    def __init__(self, questions, tags, mtime=None):
+        self.questions = tuple(questions)
+        by_tag = {}
+        for index, question_tags in enumerate(tags):
+            for tag in question_tags:
+                by_tag.setdefault(tag, []).append(index)
+        self.by_tag = {tag: tuple(indices) for tag, indices in by_tag.items()}
+        self.mtime = mtime
+        self._combinations = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Parse a role file: {"questions": [{"text": ..., "tags": [...]}, ...]}"""
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)["questions"]
+        questions = []
+        tags = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"text": entry}
+            questions.append(entry["text"])
+            tags.append(frozenset(entry.get("tags", ())))
+        return cls(questions, tags, mtime)
+
+    def matching(self, tags):
+        """Indices of the questions carrying every tag (all questions for none)"""
+        if not tags:
+            return range(len(self.questions))
+        if len(tags) == 1:
+            return self.by_tag.get(next(iter(tags)), ())
+        key = frozenset(tags)
+        indices = self._combinations.get(key)
+        if indices is None:
+            lists = sorted((self.by_tag.get(tag, ()) for tag in key), key=len)
+            others = [set(other) for other in lists[1:]]
+            indices = tuple(index for index in lists[0] if all(index in other for other in others))
+            with self._lock:
+                if len(self._combinations) >= _COMBINATION_CACHE_SIZE:
+                    self._combinations.clear()
+                self._combinations[key] = indices
+        return indices
+
+    def sample_indices(self, k, tags=()):
+        """Indices of up to k distinct questions carrying every tag, in random order"""
+        indices = self.matching(tags)
+        if len(indices) <= k:
+            chosen = list(indices)
+            random.shuffle(chosen)
+            return chosen
+        return random.sample(indices, k)
+
+
+class QuestionBank:
+    """Question pools loaded from a directory of per-role JSON files.
+
+    Each ``<role>.json`` file in ``directory`` defines one role. A role's
+    file is only read and indexed the first time that role is used, and is
+    re-read when its modification time changes (checked at most every
+    ``reload_interval`` seconds), so questions can be edited without a
+    restart. Sessions keep their own copy of the questions they were dealt,
+    so a reload never disturbs an interview in progress. If an edited file
+    fails to parse, the previous version stays in use.
+    """
+
+    def __init__(self, directory, reload_interval=2.0, clock=time.monotonic):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._checked = {}
+        self._roles = frozenset()
+        self._roles_mtime = None
+        self._roles_checked = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a bank configured from QUESTION_BANK_* environment variables"""
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "questions")
+        return cls(
+            os.environ.get("QUESTION_BANK_DIR", default),
+            reload_interval=float(os.environ.get("QUESTION_BANK_RELOAD_INTERVAL", 2.0)),
+        )
+
+    def _path(self, role):
+        return os.path.join(self.directory, role + ".json")
+
+    def _due(self, last_checked, now):
+        return last_checked is None or now - last_checked >= self.reload_interval
+
+    def roles(self):
+        """Names of all roles with a question file"""
+        now = self._clock()
+        if self._due(self._roles_checked, now):
+            with self._lock:
+                if self._due(self._roles_checked, now):
+                    mtime = os.stat(self.directory).st_mtime_ns
+                    if mtime != self._roles_mtime:
+                        self._roles = frozenset(
+                            name[:-5] for name in os.listdir(self.directory) if name.endswith(".json")
+                        )
+                        self._roles_mtime = mtime
+                    # Publish the check only after the role set is in place
+                    self._roles_checked = now
+        return self._roles
+
+    def __contains__(self, role):
+        return role in self.roles()
+
+    def pool(self, role):
+        """The indexed pool for a role, loading or reloading it as needed"""
+        now = self._clock()
+        pool = self._pools.get(role)
+        if pool is not None and not self._due(self._checked.get(role), now):
+            return pool
+        with self._lock:
+            pool = self._pools.get(role)
+            if pool is not None and not self._due(self._checked.get(role), now):
+                return pool
+            self._checked[role] = now
+            path = self._path(role)
+            try:
+                if pool is None or os.stat(path).st_mtime_ns != pool.mtime:
+                    pool = self._pools[role] = RolePool.load(path)
+            except FileNotFoundError:
+                self._pools.pop(role, None)
+                raise KeyError(role)
+            except (ValueError, KeyError, TypeError) as e:
+                if pool is None:
+                    raise
+                logging.error(f"Keeping previous questions for {role}, failed to reload {path}: {str(e)}")
+            return pool
+
+
+class QuestionScheduler:
+    """Deals each candidate a role's questions without replacement.
+
+    For every (candidate, role) pair the scheduler keeps a bitmap with one
+    bit per question in the role's pool, set once the question has been
+    dealt. Questions are drawn by rejection sampling against that bitmap,
+    which takes O(k) expected draws, independent of the pool size, while at
+    least half of the matching questions are still undealt. Only when a
+    candidate has worked through most of the pool does dealing fall back to
+    scanning the bitmap for the remaining questions; once every matching
+    question has been dealt, their bits are cleared and a new cycle begins.
+    Bitmaps are reset when the role's file is reloaded, since question
+    indices may have changed.
+
+    At most ``max_candidates`` bitmaps are kept; the least recently active
+    candidate is forgotten first, which bounds memory however many
+    candidates there are.
+    """
+
+    def __init__(self, bank, max_candidates=100000):
+        self.bank = bank
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        # (candidate_id, role) -> [bitmap, pool mtime]; oldest first
+        self._entries = OrderedDict()
+        self.evicted = 0
+
+    @classmethod
+    def from_env(cls, bank):
+        """Build a scheduler configured from QUESTION_SCHEDULER_* environment variables"""
+        return cls(bank, max_candidates=int(os.environ.get("QUESTION_SCHEDULER_MAX_CANDIDATES", 100000)))
+
+    def deal_indices(self, candidate_id, role, pool, k, tags=()):
+        """Indices into an already fetched role pool of up to k questions the candidate has not been dealt this cycle"""
+        indices = pool.matching(tags)
+        if not indices:
+            return []
+        k = min(k, len(indices))
+        key = (candidate_id, role)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != pool.mtime:
+                entry = self._entries[key] = [bytearray((len(pool.questions) + 7) // 8), pool.mtime]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_candidates:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+            bitmap = entry[0]
+
+            chosen = []
+            taken = set()
+            for _ in range(4 * k + 16):
+                if len(chosen) == k:
+                    break
+                index = indices[random.randrange(len(indices))]
+                if index not in taken and not bitmap[index >> 3] & (1 << (index & 7)):
+                    taken.add(index)
+                    chosen.append(index)
+            cycle_start = 0
+            if len(chosen) < k:
+                cycle_start = self._deal_remaining(bitmap, indices, k, chosen, taken)
+            for index in chosen[cycle_start:]:
+                bitmap[index >> 3] |= 1 << (index & 7)
+        return chosen
+
+    @staticmethod
+    def _deal_remaining(bitmap, indices, k, chosen, taken):
+        """Fill chosen from the undealt questions; returns where the current cycle starts in it.
+
+        If the cycle runs out, the questions chosen before that point close
+        the old cycle and must not be marked as dealt in the new one.
+        """
+        undealt = [index for index in indices
+                   if index not in taken and not bitmap[index >> 3] & (1 << (index & 7))]
+        if len(undealt) >= k - len(chosen):
+            chosen.extend(random.sample(undealt, k - len(chosen)))
+            return 0
+        chosen.extend(undealt)
+        taken.update(undealt)
+        # Every matching question has been dealt: start a new cycle
+        for index in indices:
+            bitmap[index >> 3] &= ~(1 << (index & 7))
+        cycle_start = len(chosen)
+        rest = [index for index in indices if index not in taken]
+        chosen.extend(random.sample(rest, k - len(chosen)))
+        return cycle_start
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
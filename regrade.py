@@ -0,0 +1,107 @@
+"""Re-score historical transcripts with the current scoring criteria.
+
+Reads JSONL records with ``question``, ``answer`` and ``role`` fields from a
+file or stdin and writes each record back out, in input order, with an
+``evaluation`` field holding the result of scoring.evaluate_answer. Lines
+are scored in chunks on a process pool with a bounded number of chunks in
+flight, so memory stays flat no matter how large the input is. Throughput
+is reported on stderr.
+
+    python regrade.py transcripts.jsonl -o regraded.jsonl
+    zcat transcripts.jsonl.gz | python regrade.py --workers 8 > regraded.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from scoring import evaluate_answer
+
+
+def regrade_chunk(lines):
+    """Score a chunk of raw JSONL lines; returns (output text, records scored)"""
+    out = []
+    scored = 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+            record["evaluation"] = evaluate_answer(record["question"], record["answer"], record["role"])
+            scored += 1
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            record = {"input": line.rstrip("\n"), "error": f"{type(e).__name__}: {e}"}
+        out.append(json.dumps(record))
+    out.append("")
+    return "\n".join(out), scored
+
+
+def read_chunks(stream, chunk_size):
+    """Group non-blank lines into lists of chunk_size"""
+    chunk = []
+    for line in stream:
+        if line.strip():
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def regrade(source, sink, workers, chunk_size, progress_interval, log=sys.stderr):
+    """Stream source to sink through a process pool; returns records scored"""
+    window = workers * 4
+    pending = deque()
+    scored = lines = 0
+    started = last_report = time.perf_counter()
+
+    def drain_one():
+        nonlocal scored, lines, last_report
+        future, size = pending.popleft()
+        text, count = future.result()
+        sink.write(text)
+        scored += count
+        lines += size
+        now = time.perf_counter()
+        if progress_interval and now - last_report >= progress_interval:
+            last_report = now
+            log.write(f"{lines} lines, {scored / (now - started):.0f} answers/s\n")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in read_chunks(source, chunk_size):
+            if len(pending) >= window:
+                drain_one()
+            pending.append((pool.submit(regrade_chunk, chunk), len(chunk)))
+        while pending:
+            drain_one()
+
+    elapsed = time.perf_counter() - started
+    log.write(f"regraded {scored} answers ({lines - scored} errors) in {elapsed:.2f}s, "
+              f"{scored / elapsed if elapsed else 0:.0f} answers/s\n")
+    return scored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score JSONL interview transcripts")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file to read (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="file to write (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000, help="lines per task sent to a worker")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between reports (0 = off)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        regrade(source, sink, args.workers, args.chunk_size, args.progress_interval)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import re
+
+# Role-specific evaluation criteria
+ROLE_CRITERIA = {
+    "software_engineer": {
+        "keywords": ["code", "programming", "development", "algorithm", "bug", "debug", "git", "version", "software", "technical", "framework", "database", "api"],
+        "required_concepts": ["technical experience", "problem-solving", "tools/technologies"],
+        "min_words": 20
+    },
+    "data_scientist": {
+        "keywords": ["data", "analysis", "machine learning", "statistics", "python", "model", "dataset", "visualization", "analytics", "regression", "classification"],
+        "required_concepts": ["data analysis", "statistical methods", "tools/languages"],
+        "min_words": 20
+    },
+    "product_manager": {
+        "keywords": ["product", "roadmap", "feature", "user", "customer", "metrics", "stakeholder", "requirement", "priority", "market"],
+        "required_concepts": ["product strategy", "user focus", "decision-making"],
+        "min_words": 20
+    },
+    "marketing_manager": {
+        "keywords": ["marketing", "campaign", "brand", "customer", "digital", "social media", "analytics", "roi", "target", "strategy"],
+        "required_concepts": ["marketing strategy", "campaign experience", "measurement"],
+        "min_words": 20
+    },
+    "sales_representative": {
+        "keywords": ["sales", "customer", "client", "relationship", "revenue", "target", "crm", "negotiation", "closing", "pipeline"],
+        "required_concepts": ["sales experience", "customer relationships", "results/achievements"],
+        "min_words": 20
+    }
+}
+
+DEFAULT_ROLE = "software_engineer"
+
+# Phrases that suggest the candidate is talking about concrete experience
+EXAMPLE_INDICATORS = ["example", "project", "experience", "worked on", "implemented", "developed", "managed", "led"]
+
+# Changes whenever the criteria above change, so cached scores can be keyed on it
+CRITERIA_FINGERPRINT = hashlib.blake2b(
+    json.dumps([ROLE_CRITERIA, EXAMPLE_INDICATORS], sort_keys=True).encode(), digest_size=8
+).hexdigest()
+
+
+def _trie_pattern(phrases):
+    """Build a regex alternation factored as a prefix trie.
+
+    Factoring shared prefixes means the regex engine follows at most one
+    branch per character instead of retrying every phrase at every offset,
+    and the greedy optional tails make each match the longest phrase that
+    starts at that position.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return re.compile(build(trie))
+
+
+class RoleMatcher:
+    """Single-pass matcher for one role's keywords and example indicators.
+
+    The scan reports the longest phrase at each leftmost match. A phrase
+    that ``phrase in answer`` would have found is then either a prefix or an
+    infix of a reported match (folded into ``implies``), or it starts inside a
+    match and runs past its end, which can only happen when a suffix of the
+    reported phrase is a prefix of another one (``overlaps``); for those the
+    scan resumes one character after the match start instead of at its end.
+    This keeps the result identical to one substring scan per phrase.
+
+    Scoring only ever looks at ``min(4, keyword_matches)`` and whether any
+    example indicator occurred, so the scan stops as soon as both are known.
+    """
+
+    max_keywords = 4
+
+    def __init__(self, keywords, indicators):
+        self.keywords = frozenset(keywords)
+        self.indicators = frozenset(indicators)
+        phrases = sorted(self.keywords | self.indicators)
+        self.pattern = _trie_pattern(phrases)
+        # phrase -> (keywords it contains, whether it contains an indicator)
+        self.implies = {
+            phrase: (
+                frozenset(other for other in self.keywords if other in phrase),
+                any(other in phrase for other in self.indicators),
+            )
+            for phrase in phrases
+        }
+        self.overlaps = frozenset(
+            phrase for phrase in phrases
+            if any(
+                other.startswith(phrase[i:]) and len(other) > len(phrase) - i
+                for other in phrases
+                for i in range(1, len(phrase))
+            )
+        )
+
+    def scan(self, answer_lower):
+        """Return (keyword_matches, has_examples) for a lowercased answer.
+
+        ``keyword_matches`` is exact up to ``max_keywords``.
+        """
+        search = self.pattern.search
+        implies = self.implies
+        overlaps = self.overlaps
+        found = set()
+        has_examples = False
+        match = search(answer_lower)
+        while match is not None:
+            phrase = match.group()
+            keywords, indicator = implies[phrase]
+            if keywords:
+                found |= keywords
+            if indicator:
+                has_examples = True
+            if has_examples and len(found) >= self.max_keywords:
+                break
+            if phrase in overlaps:
+                match = search(answer_lower, match.start() + 1)
+            else:
+                match = search(answer_lower, match.end())
+        return len(found), has_examples
+
+
+# Compiled once at import; every evaluation reuses these
+ROLE_MATCHERS = {
+    role: RoleMatcher(criteria["keywords"], EXAMPLE_INDICATORS)
+    for role, criteria in ROLE_CRITERIA.items()
+}
+
+# The length score saturates at 30 words and the satisfaction check only
+# compares against min_words, so words past this cap never change the result
+WORD_COUNT_CAP = max(30, max(criteria["min_words"] for criteria in ROLE_CRITERIA.values()))
+
+
+def evaluate_answer(question, answer, role):
+    """Enhanced evaluation that provides specific feedback and identifies issues"""
+    if not answer.strip():
+        return {
+            "score": 1,
+            "feedback": "No answer provided. Please provide a complete response to the question.",
+            "is_satisfactory": False,
+            "specific_issues": ["No response given"],
+            "improvement_suggestions": ["Please answer the question with specific examples and details"]
+        }
+
+    if role in ROLE_CRITERIA:
+        criteria = ROLE_CRITERIA[role]
+        matcher = ROLE_MATCHERS[role]
+    else:
+        criteria = ROLE_CRITERIA[DEFAULT_ROLE]
+        matcher = ROLE_MATCHERS[DEFAULT_ROLE]
+    word_count = len(answer.split(None, WORD_COUNT_CAP))
+
+    # Check for keyword relevance and specific examples in one pass
+    keyword_matches, has_examples = matcher.scan(answer.lower())
+    keyword_score = min(4, keyword_matches)
+
+    # Check answer length
+    length_score = min(3, word_count / 10)
+
+    example_score = 2 if has_examples else 0
+
+    # Calculate total score
+    total_score = keyword_score + length_score + example_score + 1  # Base score of 1
+    final_score = min(10, max(1, total_score))
+
+    # Determine if answer is satisfactory
+    is_satisfactory = final_score >= 5 and word_count >= criteria["min_words"]
+
+    # Generate specific feedback
+    issues = []
+    suggestions = []
+
+    if word_count < criteria["min_words"]:
+        issues.append("Answer is too brief")
+        suggestions.append("Provide more detailed explanations and examples")
+
+    if keyword_matches < 2:
+        issues.append(f"Missing relevant {role.replace('_', ' ')} terminology")
+        suggestions.append(f"Include specific {role.replace('_', ' ')} concepts and technologies")
+
+    if not has_examples:
+        issues.append("No specific examples provided")
+        suggestions.append("Share concrete examples from your experience")
+
+    # Generate contextual feedback
+    if final_score >= 8:
+        feedback = "Excellent answer! You provided relevant details and demonstrated strong experience."
+    elif final_score >= 6:
+        feedback = "Good answer with relevant information. " + " ".join(suggestions[:1]) if suggestions else "Consider adding more specific examples."
+    elif final_score >= 4:
+        feedback = "Your answer addresses the question but needs improvement. " + " ".join(suggestions[:2])
+    else:
+        feedback = "This answer needs significant improvement. " + " ".join(suggestions)
+
+    return {
+        "score": round(final_score, 1),
+        "feedback": feedback,
+        "is_satisfactory": is_satisfactory,
+        "specific_issues": issues,
+        "improvement_suggestions": suggestions
+    }
@@ -0,0 +1,385 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+class SessionConflict(Exception):
+    """Raised when a session was modified by another request since it was read"""
+
+
+class SQLiteConnections:
+    """One SQLite connection per thread and process for a database file.
+
+    Connections are opened in autocommit mode with WAL journaling, so
+    readers never block the writer. They must not cross a fork, so the
+    per-thread connection is replaced when the process id changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+class _Sweeper:
+    """Background thread calling ``self.sweep()`` every ``sweep_interval`` seconds"""
+
+    _sweeper = None
+
+    def start_sweeper(self):
+        """Start the background expiry thread (idempotent)"""
+        if self._sweeper is None and self.sweep_interval > 0:
+            self._stop = threading.Event()
+            self._sweeper = threading.Thread(target=self._sweep_loop, args=(self._stop,),
+                                             name="session-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._stop.set()
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _sweep_loop(self, stop):
+        while not stop.wait(self.sweep_interval):
+            self.sweep()
+
+
+class _Shard:
+    """One lock-protected LRU partition of the session store"""
+
+    __slots__ = ("lock", "entries", "capacity", "evicted_lru", "expired_idle", "expired_completed")
+
+    def __init__(self, capacity):
+        self.lock = threading.Lock()
+        # session_id -> [session, last_access, completed]; oldest first
+        self.entries = OrderedDict()
+        self.capacity = capacity
+        self.evicted_lru = 0
+        self.expired_idle = 0
+        self.expired_completed = 0
+
+
+class SessionStore(_Sweeper):
+    """Bounded in-memory session store with TTL expiry and LRU eviction.
+
+    This is the single-process backend: sessions are handed out by
+    reference, so it cannot be shared between gunicorn workers. Use
+    SQLiteSessionStore (see create_session_store) for that.
+
+    Sessions are spread over independently locked shards by a hash of the
+    session id, so concurrent requests for different candidates rarely
+    contend. Idle sessions expire after ``idle_ttl`` seconds and completed
+    ones after ``completed_ttl`` (long enough for the summary to be
+    fetched). Expiry happens lazily on access and in a background sweeper;
+    when a shard is full its least recently used session is evicted.
+    ``on_remove``, if set, is called with the id of every session dropped
+    that way (after the shard lock is released), e.g. to journal it.
+    """
+
+    on_remove = None
+
+    def __init__(self, max_sessions=10000, idle_ttl=1800, completed_ttl=3600,
+                 shards=16, sweep_interval=60, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        per_shard = max(1, -(-max_sessions // shards))
+        self._shards = [_Shard(per_shard) for _ in range(shards)]
+
+    @classmethod
+    def from_env(cls):
+        """Build a store configured from SESSION_* environment variables"""
+        return cls(
+            max_sessions=int(os.environ.get("SESSION_MAX", 10000)),
+            idle_ttl=float(os.environ.get("SESSION_IDLE_TTL", 1800)),
+            completed_ttl=float(os.environ.get("SESSION_COMPLETED_TTL", 3600)),
+            sweep_interval=float(os.environ.get("SESSION_SWEEP_INTERVAL", 60)),
+        )
+
+    def _shard(self, session_id):
+        return self._shards[zlib.crc32(session_id.encode()) % len(self._shards)]
+
+    def _expired(self, entry, now):
+        ttl = self.completed_ttl if entry[2] else self.idle_ttl
+        return now - entry[1] > ttl
+
+    def _count_expiry(self, shard, entry):
+        if entry[2]:
+            shard.expired_completed += 1
+        else:
+            shard.expired_idle += 1
+
+    def _removed(self, session_ids):
+        if self.on_remove is not None:
+            for session_id in session_ids:
+                self.on_remove(session_id)
+
+    def get(self, session_id):
+        """Return the session for session_id, or None if unknown or expired"""
+        shard = self._shard(session_id)
+        now = self._clock()
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            if entry is None:
+                return None
+            if not self._expired(entry, now):
+                entry[1] = now
+                shard.entries.move_to_end(session_id)
+                return entry[0]
+            del shard.entries[session_id]
+            self._count_expiry(shard, entry)
+        self._removed([session_id])
+        return None
+
+    def put(self, session_id, session, idle=0):
+        """Store or update a session, evicting the least recently used if full.
+
+        ``idle`` backdates its last access, for sessions restored from elsewhere.
+        """
+        shard = self._shard(session_id)
+        now = self._clock()
+        evicted = []
+        with shard.lock:
+            shard.entries[session_id] = [session, now - idle, session.completed]
+            shard.entries.move_to_end(session_id)
+            while len(shard.entries) > shard.capacity:
+                evicted.append(shard.entries.popitem(last=False)[0])
+                shard.evicted_lru += 1
+        self._removed(evicted)
+
+    def pop(self, session_id):
+        """Remove and return a session, or None if it was not stored"""
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.pop(session_id, None)
+        return entry[0] if entry else None
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def items(self):
+        """Snapshot of (session_id, session, seconds since last access) for every stored session"""
+        items = []
+        for shard in self._shards:
+            now = self._clock()
+            with shard.lock:
+                items.extend((sid, entry[0], now - entry[1]) for sid, entry in shard.entries.items())
+        return items
+
+    def sweep(self):
+        """Drop every expired session; returns how many were removed"""
+        removed = 0
+        for shard in self._shards:
+            now = self._clock()
+            with shard.lock:
+                expired = [sid for sid, entry in shard.entries.items() if self._expired(entry, now)]
+                for sid in expired:
+                    self._count_expiry(shard, shard.entries.pop(sid))
+            self._removed(expired)
+            removed += len(expired)
+        return removed
+
+    def stats(self):
+        """Current size, completed count and cumulative eviction counters"""
+        stats = {"sessions": 0, "completed": 0, "evicted_lru": 0, "expired_idle": 0, "expired_completed": 0}
+        for shard in self._shards:
+            with shard.lock:
+                stats["sessions"] += len(shard.entries)
+                stats["completed"] += sum(1 for entry in shard.entries.values() if entry[2])
+                stats["evicted_lru"] += shard.evicted_lru
+                stats["expired_idle"] += shard.expired_idle
+                stats["expired_completed"] += shard.expired_completed
+        return stats
+
+
+class SQLiteSessionStore(_Sweeper):
+    """Session store shared between worker processes through one SQLite file.
+
+    The database runs in WAL mode so readers never block the writer. Each
+    thread of each worker keeps its own pooled connection. Sessions are
+    stored as JSON next to a revision number: ``get`` records the
+    revision it read in ``session.rev`` and ``put`` only succeeds if the
+    row still carries that revision, raising SessionConflict otherwise
+    (optimistic concurrency per session). Expiry follows the same idle and
+    completed TTLs as SessionStore; the size cap is enforced by the sweeper
+    by evicting the least recently accessed rows.
+    """
+
+    # Skip refreshing last_access on reads more often than this fraction of
+    # the idle TTL, so read-only requests do not all turn into writes
+    touch_granularity = 0.05
+
+    def __init__(self, path, session_type, max_sessions=10000, idle_ttl=1800, completed_ttl=3600,
+                 sweep_interval=60, clock=time.time):
+        self.path = path
+        self.session_type = session_type
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._connections = SQLiteConnections(path)
+        self._counter_lock = threading.Lock()
+        self._counters = {"evicted_lru": 0, "expired_idle": 0, "expired_completed": 0, "conflicts": 0}
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY,"
+            " rev INTEGER NOT NULL,"
+            " completed INTEGER NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " data BLOB NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+    @classmethod
+    def from_env(cls, session_type):
+        """Build a store configured from SESSION_* environment variables"""
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sessions.db")
+        return cls(
+            os.environ.get("SESSION_DB_PATH", default),
+            session_type,
+            max_sessions=int(os.environ.get("SESSION_MAX", 10000)),
+            idle_ttl=float(os.environ.get("SESSION_IDLE_TTL", 1800)),
+            completed_ttl=float(os.environ.get("SESSION_COMPLETED_TTL", 3600)),
+            sweep_interval=float(os.environ.get("SESSION_SWEEP_INTERVAL", 60)),
+        )
+
+    def _conn(self):
+        return self._connections.get()
+
+    def _count(self, key, amount=1):
+        with self._counter_lock:
+            self._counters[key] += amount
+
+    @staticmethod
+    def _dumps(session):
+        # Plain data only: the file is shared, so loading a row must never run code.
+        # InterviewSession leaves its revision out of its state.
+        return json.dumps(session.__getstate__(), separators=(",", ":"))
+
+    def _loads(self, data):
+        """The session stored in a row, or None if the row is not a valid session"""
+        session = self.session_type.__new__(self.session_type)
+        try:
+            session.__setstate__(json.loads(data))
+        except (ValueError, TypeError) as e:
+            # e.g. a row pickled by an older version
+            logging.warning(f"Ignoring unreadable stored session: {str(e)}")
+            return None
+        return session
+
+    def get(self, session_id):
+        """Return the session for session_id, or None if unknown or expired"""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT rev, completed, last_access, data FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        rev, completed, last_access, data = row
+        now = self._clock()
+        ttl = self.completed_ttl if completed else self.idle_ttl
+        if now - last_access > ttl:
+            deleted = conn.execute("DELETE FROM sessions WHERE id = ? AND rev = ?", (session_id, rev)).rowcount
+            if deleted:
+                self._count("expired_completed" if completed else "expired_idle")
+            return None
+        if now - last_access > self.idle_ttl * self.touch_granularity:
+            conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+        session = self._loads(data)
+        if session is not None:
+            session.rev = rev
+        return session
+
+    def put(self, session_id, session):
+        """Insert a new session or update one previously returned by get.
+
+        Raises SessionConflict if another request updated it in the meantime.
+        """
+        conn = self._conn()
+        data = self._dumps(session)
+        completed = 1 if session.completed else 0
+        now = self._clock()
+        rev = session.rev
+        if rev is None:
+            conn.execute(
+                "INSERT INTO sessions (id, rev, completed, last_access, data) VALUES (?, 1, ?, ?, ?)",
+                (session_id, completed, now, data),
+            )
+            session.rev = 1
+            return
+        updated = conn.execute(
+            "UPDATE sessions SET rev = rev + 1, completed = ?, last_access = ?, data = ? WHERE id = ? AND rev = ?",
+            (completed, now, data, session_id, rev),
+        ).rowcount
+        if not updated:
+            self._count("conflicts")
+            raise SessionConflict(session_id)
+        session.rev = rev + 1
+
+    def pop(self, session_id):
+        """Remove and return a session, or None if it was not stored"""
+        conn = self._conn()
+        row = conn.execute("DELETE FROM sessions WHERE id = ? RETURNING data", (session_id,)).fetchone()
+        return self._loads(row[0]) if row else None
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def sweep(self):
+        """Drop expired sessions and trim to max_sessions; returns how many were removed"""
+        conn = self._conn()
+        now = self._clock()
+        idle = conn.execute(
+            "DELETE FROM sessions WHERE completed = 0 AND last_access < ?", (now - self.idle_ttl,)
+        ).rowcount
+        completed = conn.execute(
+            "DELETE FROM sessions WHERE completed = 1 AND last_access < ?", (now - self.completed_ttl,)
+        ).rowcount
+        overflow = len(self) - self.max_sessions
+        evicted = 0
+        if overflow > 0:
+            evicted = conn.execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        self._count("expired_idle", idle)
+        self._count("expired_completed", completed)
+        self._count("evicted_lru", evicted)
+        return idle + completed + evicted
+
+    def stats(self):
+        """Current size and this worker's cumulative eviction counters"""
+        with self._counter_lock:
+            stats = dict(self._counters)
+        stats["sessions"] = len(self)
+        stats["completed"] = self._conn().execute("SELECT COUNT(*) FROM sessions WHERE completed = 1").fetchone()[0]
+        return stats
+
+
+def create_session_store(session_type):
+    """Build the session store selected by SESSION_BACKEND (memory or sqlite) for session_type objects"""
+    backend = os.environ.get("SESSION_BACKEND", "memory")
+    if backend == "memory":
+        return SessionStore.from_env()
+    if backend == "sqlite":
+        return SQLiteSessionStore.from_env(session_type)
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
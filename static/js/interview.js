@@ -6,6 +6,10 @@ class InterviewBot {
     this.isListening = false;
     this.recognition = null;
     this.synthesis = window.speechSynthesis;
+    this.candidateId = this.getCandidateId();
+    this.questionAudioUrl = null;
+    this.audioCache = new Map();
+    this.currentAudio = null;
 
     this.initializeElements();
     this.initializeSpeechRecognition();
@@ -15,6 +19,22 @@ class InterviewBot {
     this.bindEvents();
   }
 
+  getCandidateId() {
+    // Stable per-browser id so repeat practice sessions get fresh questions
+    try {
+      let id = localStorage.getItem("interviewCandidateId");
+      if (!id) {
+        id = crypto.randomUUID
+          ? crypto.randomUUID()
+          : Date.now().toString(36) + Math.random().toString(36).slice(2);
+        localStorage.setItem("interviewCandidateId", id);
+      }
+      return id;
+    } catch (e) {
+      return null;
+    }
+  }
+
   initializeElements() {
     // Role selection elements
     this.roleSelect = document.getElementById("roleSelect");
@@ -202,6 +222,7 @@ class InterviewBot {
       } else {
         this.currentQuestionNumber = data.question_number;
         this.updateProgress();
+        this.setQuestionAudio(data);
         this.displayQuestion(data.next_question);
         this.speakQuestion();
       }
@@ -227,7 +248,10 @@ class InterviewBot {
         headers: {
           "Content-Type": "application/json",
         },
-        body: JSON.stringify({ role: selectedRole }),
+        body: JSON.stringify({
+          role: selectedRole,
+          candidate_id: this.candidateId,
+        }),
       });
 
       if (!response.ok) {
@@ -240,6 +264,7 @@ class InterviewBot {
       this.currentQuestionNumber = 1;
 
       this.showInterviewInterface();
+      this.setQuestionAudio(data);
       this.displayQuestion(data.first_question);
       this.updateProgress();
       this.hideError();
@@ -292,11 +317,60 @@ class InterviewBot {
     }
   }
 
+  setQuestionAudio(data) {
+    // Pre-rendered audio for the question being shown, and the one after it
+    this.questionAudioUrl = data.audio_url || null;
+    this.prefetchAudio(this.questionAudioUrl);
+    this.prefetchAudio(data.next_audio_url);
+  }
+
+  prefetchAudio(url) {
+    if (!url || this.audioCache.has(url)) {
+      return;
+    }
+    const audio = new Audio();
+    audio.preload = "auto";
+    audio.src = url;
+    this.audioCache.set(url, audio);
+    // Only the current and upcoming questions need to stay buffered
+    while (this.audioCache.size > 3) {
+      this.audioCache.delete(this.audioCache.keys().next().value);
+    }
+  }
+
+  stopQuestionAudio() {
+    if (this.currentAudio) {
+      this.currentAudio.pause();
+      this.currentAudio = null;
+    }
+  }
+
   speakQuestion() {
     if (this.synthesis.speaking) {
       this.synthesis.cancel();
     }
+    this.stopQuestionAudio();
+
+    if (this.questionAudioUrl) {
+      const audio =
+        this.audioCache.get(this.questionAudioUrl) ||
+        new Audio(this.questionAudioUrl);
+      audio.currentTime = 0;
+      this.currentAudio = audio;
+      // Fall back to the browser's voice if the file cannot be played
+      audio.play().catch(() => {
+        if (this.currentAudio === audio) {
+          this.currentAudio = null;
+          this.speakWithSynthesis();
+        }
+      });
+      return;
+    }
+
+    this.speakWithSynthesis();
+  }
 
+  speakWithSynthesis() {
     const utterance = new SpeechSynthesisUtterance(
       this.questionText.textContent
     );
@@ -366,8 +440,10 @@ class InterviewBot {
         // Move to next question
         this.currentQuestionNumber = data.question_number;
         this.updateProgress();
+        this.prefetchAudio(data.audio_url);
 
         setTimeout(() => {
+          this.setQuestionAudio(data);
           this.displayQuestion(data.next_question);
           this.speakQuestion();
         }, 3000);
@@ -479,6 +555,7 @@ class InterviewBot {
     if (this.synthesis.speaking) {
       this.synthesis.cancel();
     }
+    this.stopQuestionAudio();
 
     // Stop speech recognition if active
     if (this.isListening) {
@@ -602,6 +679,8 @@ class InterviewBot {
     if (this.synthesis.speaking) {
       this.synthesis.cancel();
     }
+    this.stopQuestionAudio();
+    this.questionAudioUrl = null;
 
     if (this.isListening) {
       this.recognition.stop();
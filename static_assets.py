@@ -0,0 +1,224 @@
+"""Fingerprinted, precompressed static assets.
+
+The build step copies each stylesheet and script under static/ to
+``<name>.<digest>.<ext>`` in the dist directory, where the digest hashes
+the file's content, writes gzip and (with the brotli package installed)
+brotli variants next to it, and records the mapping in manifest.json::
+
+    python static_assets.py
+    python static_assets.py --prune
+
+The Flask app's ``asset_url`` template helper returns the fingerprinted
+URL under /assets/ once an asset is built (the plain /static/ URL before
+that), and /assets/ serves the smallest variant the client accepts with
+one-year immutable caching, so a repeat visit never refetches an asset.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# File types that are fingerprinted and compressed
+ASSET_EXTENSIONS = (".css", ".js")
+
+ASSET_ROUTE = "/assets/"
+
+# Fingerprinted files never change, so clients may cache them for a year
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# Content-Encoding and file suffix of each precompressed variant, best first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+MANIFEST = "manifest.json"
+
+
+def asset_digest(data):
+    """Content fingerprint used in built file names"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (those with q=0 are refused)"""
+    accepted = set()
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _compressors():
+    compressors = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        logging.warning("brotli is not installed; building gzip variants only")
+    else:
+        compressors["br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def build_assets(source_dir, dist_dir, prune=False, log=logging.info):
+    """Fingerprint and compress every asset under source_dir; returns the manifest.
+
+    Variants are only kept when smaller than the original. Files from
+    earlier builds stay in place, so pages cached before a deploy can
+    still load their assets, unless ``prune`` deletes everything the new
+    manifest does not reference.
+    """
+    compressors = _compressors()
+    dist_dir = os.path.abspath(dist_dir)
+    assets = {}
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != dist_dir)
+        for filename in sorted(files):
+            if not filename.endswith(ASSET_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, source_dir).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                data = f.read()
+            stem, ext = os.path.splitext(name)
+            built = f"{stem}.{asset_digest(data)}{ext}"
+            target = os.path.join(dist_dir, built)
+            _write(target, data)
+            sizes = [f"{len(data)} B"]
+            encodings = []
+            for encoding, suffix in ENCODINGS:
+                if encoding not in compressors:
+                    continue
+                compressed = compressors[encoding](data)
+                if len(compressed) < len(data):
+                    _write(target + suffix, compressed)
+                    encodings.append(encoding)
+                    sizes.append(f"{encoding} {len(compressed)} B")
+            assets[name] = {"path": built, "encodings": encodings}
+            log(f"{name} -> {built} ({', '.join(sizes)})")
+
+    manifest = {"assets": assets}
+    _write(os.path.join(dist_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    if prune:
+        keep = {MANIFEST}
+        for asset in assets.values():
+            keep.add(asset["path"])
+            keep.update(asset["path"] + suffix for encoding, suffix in ENCODINGS if encoding in asset["encodings"])
+        for root, dirs, files in os.walk(dist_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if os.path.relpath(path, dist_dir).replace(os.sep, "/") not in keep:
+                    os.remove(path)
+    return manifest
+
+
+class StaticAssets:
+    """The built assets in a dist directory, as described by its manifest.
+
+    The manifest is re-read when it changes, checked at most every
+    ``reload_interval`` seconds, so a rebuild is picked up without a
+    restart. Only built assets inside the dist directory are served.
+    """
+
+    def __init__(self, dist_dir, reload_interval=2.0, clock=time.monotonic):
+        self.dist_dir = dist_dir
+        self.reload_interval = reload_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._urls = {}
+        self._files = {}
+        self._mtime = None
+        self._checked = None
+
+    @classmethod
+    def from_env(cls):
+        """Build the asset index configured from STATIC_DIST_DIR"""
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "dist")
+        return cls(os.environ.get("STATIC_DIST_DIR", default))
+
+    def _load(self):
+        now = self._clock()
+        if self._checked is not None and now - self._checked < self.reload_interval:
+            return
+        with self._lock:
+            if self._checked is not None and now - self._checked < self.reload_interval:
+                return
+            path = os.path.join(self.dist_dir, MANIFEST)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime != self._mtime:
+                assets = {}
+                if mtime is not None:
+                    try:
+                        with open(path) as f:
+                            assets = json.load(f)["assets"]
+                    except (OSError, ValueError, KeyError) as e:
+                        logging.error(f"Keeping previous asset manifest, failed to read {path}: {str(e)}")
+                        assets = None
+                if assets is not None:
+                    self._urls = {name: ASSET_ROUTE + asset["path"] for name, asset in assets.items()}
+                    self._files = {asset["path"]: tuple(asset["encodings"]) for asset in assets.values()}
+                    self._mtime = mtime
+            self._checked = now
+
+    def url(self, name):
+        """Fingerprinted URL of a static file, or None if it has not been built"""
+        self._load()
+        return self._urls.get(name)
+
+    def select(self, built, accept_encoding=""):
+        """(path, Content-Encoding or None) of the best variant of a built file, or None if unknown.
+
+        Files from earlier builds that are still on disk are served too,
+        without negotiation, for pages cached before a rebuild.
+        """
+        self._load()
+        encodings = self._files.get(built)
+        path = os.path.join(self.dist_dir, built)
+        if encodings is None:
+            root = os.path.realpath(self.dist_dir) + os.sep
+            if (os.path.splitext(built)[1] in ASSET_EXTENSIONS and os.path.realpath(path).startswith(root)
+                    and os.path.isfile(path)):
+                return path, None
+            return None
+        if encodings and accept_encoding:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, suffix in ENCODINGS:
+                if encoding in encodings and (encoding in accepted or "*" in accepted):
+                    return path + suffix, encoding
+        return path, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress the static assets")
+    parser.add_argument("--source", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"),
+                        help="directory of assets to build (default: static/)")
+    parser.add_argument("--dist", help="output directory (default: STATIC_DIST_DIR or static/dist)")
+    parser.add_argument("--prune", action="store_true", help="delete files from earlier builds")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    build_assets(args.source, args.dist or StaticAssets.from_env().dist_dir, prune=args.prune)
+
+
+if __name__ == '__main__':
+    main()
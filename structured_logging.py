@@ -0,0 +1,190 @@
+"""Queue-based structured logging.
+
+``configure_logging`` replaces synchronous console logging with a
+QueueHandler on the root logger: request threads only put records on an
+in-memory queue, and a QueueListener thread formats them as one JSON object
+per line and writes them out. Records carry the session id and role of the
+request that logged them (see ``bind``), and each API request produces one
+``request`` record with its endpoint, status and latency.
+
+High-volume events can be sampled: records logged with
+``extra={"event": name}`` are kept with the probability LOG_SAMPLING gives
+for that name (``request=0.1,...``). Warnings and errors are always kept.
+The queue holds at most LOG_QUEUE_SIZE records; if the output falls that
+far behind, further records are dropped (and counted) rather than making
+requests wait for it.
+"""
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+from json_provider import load_backend
+
+# Fields copied from a record's extra / the request context into the JSON output
+CONTEXT_FIELDS = ("session_id", "role", "endpoint", "method", "status", "latency_ms", "event")
+
+# Loggers whose own per-request lines duplicate our request records
+ACCESS_LOGGERS = ("werkzeug", "uvicorn.access")
+
+_request_context = contextvars.ContextVar("request_context", default=None)
+
+
+def start_request():
+    """Begin a request's log context; later ``bind`` calls for it fill in the returned dict.
+
+    The dict is shared rather than copied, so values bound in a worker
+    thread or a child task are visible to whoever logs the request at the end.
+    """
+    context = {}
+    _request_context.set(context)
+    return context
+
+
+def bind(**fields):
+    """Attach fields (session_id, role) to every record logged for the current request"""
+    context = _request_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def parse_sampling(spec):
+    """``event=rate,...`` as {event: rate}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Samples event records and stamps the rest with the current request context.
+
+    Runs on the logging thread, before the record is queued, so dropped
+    records cost no more than this check.
+    """
+
+    def __init__(self, sampling=None):
+        super().__init__()
+        self.sampling = sampling or {}
+
+    def filter(self, record):
+        event = getattr(record, "event", None)
+        if event is not None and record.levelno < logging.WARNING:
+            rate = self.sampling.get(event, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                return False
+        context = _request_context.get()
+        if context:
+            for name, value in context.items():
+                if not hasattr(record, name):
+                    setattr(record, name, value)
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats each record before queueing it so it can be
+    pickled; records here stay in-process, so they are queued as they are.
+    Records that do not fit in a full queue are counted in ``dropped``.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    # The stop sentinel must get through even when the queue is full
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any context fields"""
+
+    def __init__(self):
+        super().__init__()
+        self._dumps = load_backend().dumps
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return self._dumps(entry, default=str).decode()
+
+
+def configure_logging(level=None, fmt=None, sampling=None, queue_size=None, stream=None):
+    """Route all logging through a background listener; returns the listener.
+
+    Settings default to LOG_LEVEL (INFO), LOG_FORMAT (``json`` or
+    ``text``), LOG_SAMPLING and LOG_QUEUE_SIZE (10000). Like
+    ``logging.basicConfig`` it does nothing, returning None, if the root
+    logger already has handlers.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+    level = level or os.environ.get("LOG_LEVEL", "INFO").upper()
+    fmt = fmt or os.environ.get("LOG_FORMAT", "json")
+    if sampling is None:
+        sampling = parse_sampling(os.environ.get("LOG_SAMPLING", ""))
+    if queue_size is None:
+        queue_size = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter() if fmt == "json" else logging.Formatter(logging.BASIC_FORMAT))
+    listener = _Listener(queue.Queue(queue_size), output, respect_handler_level=True)
+
+    handler = DeferredQueueHandler(listener.queue)
+    handler.addFilter(ContextFilter(sampling))
+    root.addHandler(handler)
+    root.setLevel(level)
+    for name in ACCESS_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    def stop():
+        listener.stop()
+        if handler.dropped:
+            output.stream.write(f"{handler.dropped} log records dropped because the log queue was full\n")
+
+    listener.start()
+    atexit.register(stop)
+    return listener
+
+
+request_logger = logging.getLogger("interview.requests")
+
+
+def log_request(endpoint, method, status, started):
+    """The ``request`` record for an API call that began at perf_counter() ``started``"""
+    request_logger.log(
+        logging.WARNING if status >= 500 else logging.INFO,
+        "%s %s %d", method, endpoint, status,
+        extra={"event": "request", "endpoint": endpoint, "method": method, "status": status,
+               "latency_ms": round((time.perf_counter() - started) * 1e3, 3)},
+    )
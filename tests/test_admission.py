@@ -0,0 +1,102 @@
+import pytest
+from werkzeug.datastructures import Headers
+
+from admission import DEFAULT_RATE_LIMITS, AdmissionControl, TokenBucketLimiter, parse_rate_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("") == {}
+    assert parse_rate_limits("off") == {}
+    assert parse_rate_limits("on") == DEFAULT_RATE_LIMITS
+    limits = parse_rate_limits("/api/start-interview=0.5/10, /api/other=2")
+    assert limits["/api/start-interview"] == (0.5, 10)
+    assert limits["/api/other"] == (2, 1)
+    assert limits["/api/submit-answer"] == DEFAULT_RATE_LIMITS["/api/submit-answer"]
+
+
+@pytest.mark.parametrize("spec", ["/x=0/5", "/x=-1/5", "/x=2/0", "/x=2/0.5"])
+def test_parse_rate_limits_rejects_unusable_buckets(spec):
+    with pytest.raises(ValueError):
+        parse_rate_limits(spec)
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter({"/x": (2.0, 3)}, clock=clock)
+    assert [limiter.acquire("c", "/x") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("c", "/x") == 0.5
+    assert limiter.acquire("other", "/x") == 0
+    assert limiter.acquire("c", "/unlimited") == 0
+    clock.now = 0.5
+    assert limiter.acquire("c", "/x") == 0
+
+
+def test_idle_and_excess_buckets_are_evicted():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter({"/x": (1.0, 2)}, max_buckets=3, clock=clock)
+    for client in "abcd":
+        limiter.acquire(client, "/x")
+    assert len(limiter) == 3
+    assert limiter.evicted == 1
+    clock.now = 10
+    limiter.acquire("e", "/x")
+    assert len(limiter) < 3
+
+
+def test_single_bucket_cap_keeps_limiting():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter({"/x": (1.0, 1)}, max_buckets=1, clock=clock)
+    assert limiter.acquire("a", "/x") == 0
+    assert limiter.acquire("b", "/x") == 0
+    assert limiter.acquire("b", "/x") == 1.0
+    clock.now += 100
+    assert limiter.acquire("a", "/x") == 0
+
+
+def test_bucket_cap_must_hold_a_bucket():
+    with pytest.raises(ValueError):
+        TokenBucketLimiter({"/x": (1.0, 1)}, max_buckets=0)
+
+
+def test_evaluations_over_the_cap_are_shed():
+    admission = AdmissionControl(limits={}, max_evaluations=1)
+    assert admission.admit("a", "/api/submit-answer") is None
+    rejection = admission.admit("b", "/api/submit-answer")
+    assert (rejection.status, rejection.reason) == (503, "overloaded")
+    admission.release("/api/submit-answer")
+    assert admission.admit("b", "/api/submit-answer") is None
+    assert admission.shed_counts() == [(("/api/submit-answer", "overloaded"), 1)]
+
+
+def test_rate_limited_request_gets_retry_after():
+    admission = AdmissionControl(limits={"/x": (0.5, 1)}, clock=FakeClock())
+    assert admission.admit("a", "/x") is None
+    rejection = admission.admit("a", "/x")
+    assert (rejection.status, rejection.retry_after, rejection.reason) == (429, 2, "rate_limited")
+
+
+def test_client_id_ignores_forwarded_for_without_trusted_proxies():
+    admission = AdmissionControl(limits={})
+    assert admission.client_id(Headers({"X-Forwarded-For": "1.1.1.1"}), "10.0.0.1") == "10.0.0.1"
+    assert admission.client_id(Headers(), None) == "unknown"
+
+
+def test_client_id_takes_the_address_the_trusted_proxy_saw():
+    admission = AdmissionControl(limits={}, trusted_proxies=1)
+    # Whatever the client puts on the left does not change its identity
+    for spoofed in ("1.1.1.1", "2.2.2.2, 3.3.3.3"):
+        headers = Headers({"X-Forwarded-For": f"{spoofed}, 9.9.9.9"})
+        assert admission.client_id(headers, "10.0.0.1") == "9.9.9.9"
+    headers = Headers([("X-Forwarded-For", "1.1.1.1"), ("X-Forwarded-For", "8.8.8.8")])
+    assert admission.client_id(headers, "10.0.0.1") == "8.8.8.8"
+    two_hops = AdmissionControl(limits={}, trusted_proxies=2)
+    assert two_hops.client_id(Headers({"X-Forwarded-For": "7.7.7.7, 9.9.9.9"}), "10.0.0.1") == "7.7.7.7"
+    assert two_hops.client_id(Headers({"X-Forwarded-For": "9.9.9.9"}), "10.0.0.1") == "10.0.0.1"
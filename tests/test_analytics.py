@@ -0,0 +1,66 @@
+import glob
+import os
+import time
+
+from analytics import InterviewAnalytics
+
+
+def record_interview(analytics, role="software_engineer"):
+    analytics.started(role)
+    analytics.answered(role, "Tell me about yourself.", 6.5, True)
+    analytics.completed(role, 6.5)
+
+
+def files(directory):
+    return glob.glob(os.path.join(directory, "analytics-*.json"))
+
+
+def test_workers_sharing_a_pid_keep_separate_totals(tmp_path):
+    directory = str(tmp_path)
+    # Both instances live in this process, as a new worker reusing a dead one's PID would
+    old, new = InterviewAnalytics(directory), InterviewAnalytics(directory)
+    record_interview(old)
+    old.flush()
+    record_interview(new)
+    new.flush()
+    assert len(files(directory)) == 2
+    assert new.collect()["roles"]["software_engineer"]["completed"] == 2
+
+
+def test_stale_snapshots_are_folded_into_a_new_worker(tmp_path):
+    directory = str(tmp_path)
+    for _ in range(2):
+        dead = InterviewAnalytics(directory)
+        record_interview(dead)
+        dead.flush()
+    hour_ago = time.time() - 3600
+    for path in files(directory):
+        os.utime(path, (hour_ago, hour_ago))
+
+    worker = InterviewAnalytics(directory, retire_after=60)
+    assert worker.retire_stale() == 2
+    assert len(files(directory)) == 1
+    assert os.listdir(directory) == [os.path.basename(files(directory)[0])]
+    report = worker.collect()
+    assert report["roles"]["software_engineer"]["completed"] == 2
+    assert report["questions"]["software_engineer"]["Tell me about yourself."][0] == 2
+
+
+def test_recent_snapshots_are_not_retired(tmp_path):
+    directory = str(tmp_path)
+    live = InterviewAnalytics(directory)
+    record_interview(live)
+    live.flush()
+    assert InterviewAnalytics(directory, retire_after=60).retire_stale() == 0
+
+
+def test_worker_whose_file_was_retired_does_not_count_twice(tmp_path):
+    directory = str(tmp_path)
+    slow = InterviewAnalytics(directory)
+    record_interview(slow)
+    slow.flush()
+    os.utime(files(directory)[0], (0, 0))
+    other = InterviewAnalytics(directory, retire_after=60)
+    other.retire_stale()
+    slow.flush()
+    assert other.collect()["roles"]["software_engineer"]["completed"] == 1
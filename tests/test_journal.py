@@ -0,0 +1,167 @@
+import os
+import time
+
+import pytest
+
+from interview import InterviewSession
+from journal import SessionJournal
+from session_store import SessionStore, SQLiteSessionStore
+
+POOL = ("Tell me about yourself.", "Describe a hard bug you fixed.")
+
+
+def make_session():
+    return InterviewSession("software_engineer", POOL, [0, 1], time.time())
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return str(tmp_path / "journal")
+
+
+def reopen(directory, **kwargs):
+    journal = SessionJournal(directory, **kwargs)
+    sessions = journal.replay()
+    return journal, sessions
+
+
+def test_replay_returns_last_state_of_each_session(journal_dir):
+    journal = SessionJournal(journal_dir)
+    journal.start()
+    first, second = make_session(), make_session()
+    journal.record("start", "a", first)
+    journal.record("start", "b", second)
+    first.record_answer("I fixed a race", 7.5, "Good answer")
+    journal.record("answer", "a", first)
+    journal.record("cancel", "b", second)
+    journal.close()
+
+    journal, sessions = reopen(journal_dir)
+    journal.close()
+    assert set(sessions) == {"a"}
+    session, _ = sessions["a"]
+    assert session.current_question == 1
+    assert session.answers == [("I fixed a race", 7.5, "Good answer")]
+    assert session.question(1) == POOL[1]
+
+
+def test_torn_tail_is_dropped_and_truncated(journal_dir):
+    journal = SessionJournal(journal_dir)
+    journal.start()
+    journal.record("start", "a", make_session())
+    segment = journal._path("journal", journal._segment)
+    journal.close()
+    intact = os.path.getsize(segment)
+    with open(segment, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x00\x00\x00\x00partial record")
+
+    journal, sessions = reopen(journal_dir)
+    assert set(sessions) == {"a"}
+    assert os.path.getsize(segment) == intact
+    # Records written after the recovery replay on top of the truncated segment
+    journal.start()
+    journal.record("start", "b", make_session())
+    journal.close()
+    journal, sessions = reopen(journal_dir)
+    journal.close()
+    assert set(sessions) == {"a", "b"}
+
+
+def test_compaction_snapshot_replays_with_later_records(journal_dir):
+    store = SessionStore()
+    journal = SessionJournal(journal_dir, snapshot_every=3, snapshot_source=store.items)
+    journal.start()
+    for number in range(5):
+        session_id = f"s{number}"
+        store.put(session_id, make_session())
+        journal.record("start", session_id, store.get(session_id))
+    journal.close()
+
+    assert any(name.startswith("snapshot-") for name in os.listdir(journal_dir))
+    journal, sessions = reopen(journal_dir)
+    journal.close()
+    assert set(sessions) == {f"s{number}" for number in range(5)}
+
+
+def test_restore_skips_expired_sessions(journal_dir):
+    journal = SessionJournal(journal_dir)
+    journal.start()
+    journal.record("start", "a", make_session())
+    journal.close()
+
+    journal = SessionJournal(journal_dir)
+    store = SessionStore()
+    assert journal.restore(store, idle_ttl=60, completed_ttl=60) == 1
+    assert store.get("a") is not None
+    assert journal.restore(SessionStore(), idle_ttl=-1, completed_ttl=-1) == 0
+    journal.close()
+
+
+def test_from_env_requires_the_in_memory_backend(journal_dir, tmp_path, monkeypatch):
+    monkeypatch.setenv("JOURNAL_DIR", journal_dir)
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), InterviewSession)
+    with pytest.raises(ValueError, match="SESSION_BACKEND=memory"):
+        SessionJournal.from_env(store)
+
+    journal = SessionJournal.from_env(SessionStore())
+    journal.close()
+
+
+def test_second_process_cannot_share_the_directory(journal_dir):
+    journal = SessionJournal(journal_dir)
+    try:
+        with pytest.raises(RuntimeError, match="single worker"):
+            SessionJournal(journal_dir)
+    finally:
+        journal.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_snapshot_keeps_when_each_session_was_last_used(journal_dir):
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=600, clock=clock)
+    journal = SessionJournal(journal_dir, snapshot_source=store.items)
+    journal.start()
+    store.put("old", make_session())
+    journal.record("start", "old", store.get("old"))
+    clock.now += 500
+    store.put("new", make_session())
+    journal.record("start", "new", store.get("new"))
+    journal.compact()
+    journal.close()
+
+    journal = SessionJournal(journal_dir)
+    sessions = journal.replay()
+    assert sessions["new"][1] - sessions["old"][1] == pytest.approx(500, abs=1)
+    restored = SessionStore(idle_ttl=600, clock=clock)
+    assert journal.restore(restored, idle_ttl=600, completed_ttl=600) == 2
+    # "old" came back 500 s into its 600 s idle TTL, not with a fresh one
+    clock.now += 150
+    assert restored.get("old") is None
+    assert restored.get("new") is not None
+    journal.close()
+
+
+def test_evicted_and_expired_sessions_stay_dropped(journal_dir, monkeypatch):
+    monkeypatch.setenv("JOURNAL_DIR", journal_dir)
+    clock = FakeClock()
+    store = SessionStore(max_sessions=2, shards=1, idle_ttl=10, clock=clock)
+    journal = SessionJournal.from_env(store)
+    journal.start()
+    for session_id in ("a", "b", "c"):
+        store.put(session_id, make_session())
+        journal.record("start", session_id, store.get(session_id))
+    clock.now += 11
+    store.sweep()
+    journal.close()
+
+    journal = SessionJournal(journal_dir)
+    assert journal.replay() == {}
+    journal.close()
@@ -0,0 +1,41 @@
+import json
+import random
+
+import pytest
+
+from question_bank import QuestionBank, QuestionScheduler
+
+
+@pytest.fixture
+def bank(tmp_path):
+    questions = [{"text": f"Question {number}", "tags": ["senior"] if number % 2 else []}
+                 for number in range(14)]
+    (tmp_path / "engineer.json").write_text(json.dumps({"questions": questions}))
+    return QuestionBank(str(tmp_path))
+
+
+def dealt_sequence(bank, tags, deals, k=5):
+    scheduler = QuestionScheduler(bank)
+    pool = bank.pool("engineer")
+    sequence = []
+    for _ in range(deals):
+        chosen = scheduler.deal_indices("candidate", "engineer", pool, k, tags)
+        assert len(set(chosen)) == len(chosen)
+        sequence.extend(chosen)
+    return sequence, pool.matching(tags)
+
+
+@pytest.mark.parametrize("tags", [(), ("senior",)])
+def test_every_cycle_deals_each_matching_question_once(bank, tags):
+    random.seed(7)
+    sequence, matching = dealt_sequence(bank, tags, deals=40)
+    cycle = len(matching)
+    for start in range(0, len(sequence) - cycle + 1, cycle):
+        assert sorted(sequence[start:start + cycle]) == sorted(matching)
+
+
+def test_pool_smaller_than_an_interview_deals_all_of_it(bank):
+    scheduler = QuestionScheduler(bank)
+    pool = bank.pool("engineer")
+    chosen = scheduler.deal_indices("candidate", "engineer", pool, 20)
+    assert sorted(chosen) == list(range(14))
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from evaluators import CachedEvaluator, EvaluationCache, FallbackResult, RemoteEvaluator
+from fake_model_server import start_fake_server
+from scoring import evaluate_answer
+
+QUESTION = "Describe a project."
+ANSWER = (
+    "In my last project I developed a software framework for our team, wrote most of the code "
+    "and fixed a hard bug while debugging the algorithm."
+)
+ROLE = "software_engineer"
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    server = start_fake_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def serve(fake_server):
+    """Configure the shared fake server for one test"""
+
+    def configure(delay=0.0, error_rate=0.0, mangle=None):
+        fake_server.delay, fake_server.error_rate, fake_server.mangle = delay, error_rate, mangle
+        fake_server.requests = 0
+        return fake_server
+
+    return configure
+
+
+def test_remote_result_within_budget(serve):
+    evaluator = RemoteEvaluator(serve().url, budget=2.0)
+    result = evaluator.evaluate(QUESTION, ANSWER, ROLE)
+    assert not isinstance(result, FallbackResult)
+    assert result == evaluate_answer(QUESTION, ANSWER, ROLE)
+    assert evaluator.stats()["remote"] == 1
+
+
+def test_slow_server_falls_back_once_the_budget_runs_out(serve):
+    evaluator = RemoteEvaluator(serve(delay=1.0).url, budget=0.2)
+    started = time.perf_counter()
+    result = evaluator.evaluate(QUESTION, ANSWER, ROLE)
+    assert time.perf_counter() - started < 0.8
+    assert isinstance(result, FallbackResult)
+    assert result == evaluate_answer(QUESTION, ANSWER, ROLE)
+    assert evaluator.stats()["fallback_timeout"] == 1
+
+
+def test_concurrent_async_calls_share_batches(serve):
+    server = serve(delay=0.05)
+    evaluator = RemoteEvaluator(server.url, budget=2.0, batch_size=8, batch_wait=0.05)
+
+    async def fire():
+        return await asyncio.gather(*(evaluator.evaluate_async(QUESTION, ANSWER, ROLE) for _ in range(16)))
+
+    results = asyncio.run(fire())
+    assert not any(isinstance(result, FallbackResult) for result in results)
+    assert server.requests < 16
+
+
+def test_server_errors_fall_back(serve):
+    evaluator = RemoteEvaluator(serve(error_rate=1.0).url, budget=2.0)
+    assert isinstance(evaluator.evaluate(QUESTION, ANSWER, ROLE), FallbackResult)
+    assert evaluator.stats()["fallback_error"] == 1
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda result: dict(result, score="7"),
+    lambda result: dict(result, score=True),
+    lambda result: dict(result, score=11),
+    lambda result: dict(result, is_satisfactory="yes"),
+    lambda result: dict(result, feedback=None),
+    lambda result: dict(result, specific_issues=[1, 2]),
+    lambda result: dict(result, improvement_suggestions="more detail"),
+    lambda result: {key: value for key, value in result.items() if key != "score"},
+    lambda result: [result],
+], ids=["score-str", "score-bool", "score-range", "satisfactory-str", "feedback-none",
+        "issues-ints", "suggestions-str", "missing-key", "not-object"])
+def test_malformed_results_fall_back(serve, mangle):
+    evaluator = RemoteEvaluator(serve(mangle=mangle).url, budget=2.0)
+    result = evaluator.evaluate(QUESTION, ANSWER, ROLE)
+    assert isinstance(result, FallbackResult)
+    assert result == evaluate_answer(QUESTION, ANSWER, ROLE)
+    assert evaluator.stats()["fallback_error"] == 1
+
+
+def test_fallback_results_are_not_cached(serve):
+    server = serve(delay=1.0)
+    cache = EvaluationCache()
+    evaluator = CachedEvaluator(RemoteEvaluator(server.url, budget=0.2), cache)
+    for _ in range(2):
+        assert isinstance(evaluator.evaluate(QUESTION, ANSWER, ROLE), FallbackResult)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["misses"] == 2
+
+    server.delay = 0.0
+    first = evaluator.evaluate(QUESTION, ANSWER, ROLE)
+    assert not isinstance(first, FallbackResult)
+    assert evaluator.evaluate(QUESTION, ANSWER, ROLE) == first
+    assert cache.stats()["hits"] == 1
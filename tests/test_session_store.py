@@ -0,0 +1,189 @@
+import json
+import multiprocessing
+import pickle
+import threading
+import time
+
+import pytest
+
+from interview import InterviewSession
+from session_store import SessionConflict, SessionStore, SQLiteSessionStore
+
+POOL = ("Tell me about yourself.", "Describe a hard bug you fixed.")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_session():
+    return InterviewSession("software_engineer", POOL, [0, 1], time.time())
+
+
+def completed_session():
+    session = make_session()
+    session.record_answer("first", 6.0, "ok")
+    session.record_answer("second", 7.0, "ok")
+    return session
+
+
+def test_memory_store_evicts_least_recently_used_per_shard():
+    store = SessionStore(max_sessions=2, shards=1, clock=FakeClock())
+    store.put("a", make_session())
+    store.put("b", make_session())
+    store.get("a")
+    store.put("c", make_session())
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.stats()["evicted_lru"] == 1
+
+
+def test_memory_store_shards_keep_their_own_capacity():
+    store = SessionStore(max_sessions=8, shards=4, clock=FakeClock())
+    for number in range(100):
+        store.put(f"s{number}", make_session())
+    assert len(store) == 8
+    assert store.stats()["evicted_lru"] == 92
+    assert all(len(shard.entries) == 2 for shard in store._shards)
+
+
+def test_memory_store_expires_lazily_with_separate_ttls():
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=10, completed_ttl=100, clock=clock)
+    store.put("idle", make_session())
+    store.put("done", completed_session())
+    clock.now += 11
+    assert store.get("idle") is None
+    assert store.get("done") is not None
+    clock.now += 101
+    assert store.get("done") is None
+    stats = store.stats()
+    assert (stats["expired_idle"], stats["expired_completed"], stats["sessions"]) == (1, 1, 0)
+
+
+def test_memory_store_access_refreshes_idle_ttl():
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=10, clock=clock)
+    store.put("a", make_session())
+    for _ in range(3):
+        clock.now += 8
+        assert store.get("a") is not None
+
+
+def test_memory_store_sweep_drops_expired_sessions():
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=10, completed_ttl=100, clock=clock)
+    store.put("idle", make_session())
+    store.put("done", completed_session())
+    clock.now += 5
+    store.put("fresh", make_session())
+    clock.now += 6
+    assert store.sweep() == 1
+    assert store.stats() == {"sessions": 2, "completed": 1, "evicted_lru": 0,
+                             "expired_idle": 1, "expired_completed": 0}
+    assert sorted((session_id, idle) for session_id, _, idle in store.items()) == [("done", 11), ("fresh", 6)]
+    assert store.pop("fresh") is not None and store.pop("fresh") is None
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_put_get_pop_roundtrip(db_path):
+    store = SQLiteSessionStore(db_path, InterviewSession)
+    store.put("a", make_session())
+    session = store.get("a")
+    assert session.rev == 1
+    session.record_answer("answer", 6.0, "ok")
+    store.put("a", session)
+    assert session.rev == 2
+    stored = store.get("a")
+    assert stored.answers == [("answer", 6.0, "ok")]
+    assert stored.question(1) == POOL[1]
+    assert store.pop("a").current_question == 1
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_stale_write_raises_conflict(db_path):
+    store = SQLiteSessionStore(db_path, InterviewSession)
+    store.put("a", make_session())
+    first, second = store.get("a"), store.get("a")
+    first.record_answer("first", 5.0, "ok")
+    store.put("a", first)
+    second.record_answer("second", 5.0, "ok")
+    with pytest.raises(SessionConflict):
+        store.put("a", second)
+    assert store.stats()["conflicts"] == 1
+    assert store.get("a").answers[0][0] == "first"
+
+
+def test_expiry_and_size_cap(db_path):
+    clock = FakeClock()
+    store = SQLiteSessionStore(db_path, InterviewSession, max_sessions=2, idle_ttl=10, completed_ttl=100, clock=clock)
+    store.put("idle", make_session())
+    clock.now += 11
+    assert store.get("idle") is None
+    assert store.stats()["expired_idle"] == 1
+
+    for session_id in ("a", "b", "c"):
+        store.put(session_id, make_session())
+        clock.now += 1
+    assert store.sweep() == 1
+    assert store.get("a") is None
+    assert len(store) == 2
+    assert store.stats()["evicted_lru"] == 1
+
+
+def test_threads_share_the_database(db_path):
+    store = SQLiteSessionStore(db_path, InterviewSession)
+    errors = []
+
+    def writer(number):
+        try:
+            for index in range(20):
+                store.put(f"{number}-{index}", make_session())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(number,)) for number in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store) == 80
+
+
+def _write_from_child(path):
+    SQLiteSessionStore(path, InterviewSession).put("from-child", make_session())
+
+
+def test_sessions_are_visible_across_processes(db_path):
+    store = SQLiteSessionStore(db_path, InterviewSession)
+    store.put("from-parent", make_session())
+    child = multiprocessing.get_context("fork").Process(target=_write_from_child, args=(db_path,))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert store.get("from-child") is not None
+
+
+class _Planted:
+    def __reduce__(self):
+        return (open, ("/nonexistent/planted-by-test", "w"))
+
+
+def test_rows_are_data_only(db_path):
+    store = SQLiteSessionStore(db_path, InterviewSession)
+    store.put("a", make_session())
+    row = store._conn().execute("SELECT data FROM sessions WHERE id = 'a'").fetchone()
+    assert json.loads(row[0])[1] == list(POOL)
+    # A pickled payload planted in the shared file is ignored, never unpickled
+    store._conn().execute("UPDATE sessions SET data = ? WHERE id = 'a'", (pickle.dumps(_Planted()),))
+    assert store.get("a") is None